@@ -4,6 +4,8 @@ CHAR_FIELD_LENGTH = 100
 CODE_FIELD_LENGTH = 50
 NODATA = -9999.0
 DEFAULT_EMISSION_UNIT = "kg/year"
+# nr of records per query when bulk creating or updating records
+BATCH_SIZE = 1000
 
 # sheet names which are valid for data import
 SHEET_NAMES = [
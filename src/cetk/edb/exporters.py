@@ -1,4 +1,3 @@
-import ast
 import os
 
 # need to import fiona before geopandas due to gpd bug causing circular imports.
@@ -171,7 +170,7 @@ def export_sources(export_filepath, srid=WGS84_SRID, unit=DEFAULT_EMISSION_UNIT)
         worksheet = workbook.create_sheet(title="ActivityCode")
         header = ["codeset_slug", "activitycode", "label", "vertical_distribution_slug"]
         worksheet.append(header)
-        for ac in ActivityCode.objects.all():
+        for ac in ActivityCode.objects.select_related("code_set", "vertical_dist"):
             if ac.vertical_dist is not None:
                 worksheet.append(
                     [ac.code_set.slug, ac.code, ac.label, ac.vertical_dist.slug]
@@ -330,15 +329,12 @@ def create_vehiclefuel_sheet(workbook):
     codeset_columns = [f"activitycode_{slug}" for slug in codeset_slugs]
     header = header + codeset_columns
     worksheet.append(header)
-    for vf in VehicleFuelComb.objects.all():
+    # codes are read in a single query instead of one query per combination
+    codes = dict(ActivityCode.objects.values_list("id", "code"))
+    for vf in VehicleFuelComb.objects.select_related("vehicle", "fuel"):
         row = [vf.vehicle.name, str(vf.vehicle.isheavy), vf.vehicle.info, vf.fuel.name]
         for i in codeset_ids:
-            try:
-                row.append(
-                    ActivityCode.objects.get(id=getattr(vf, f"activitycode{i}_id")).code
-                )
-            except ActivityCode.DoesNotExist:
-                row.append("")
+            row.append(codes.get(getattr(vf, f"activitycode{i}_id"), ""))
         worksheet.append(row)
 
 
@@ -402,9 +398,9 @@ def create_timevar_sheet(worksheet, tvar_type):
     for tvar in tvar_type.objects.all():
         worksheet.append(days_header)
         if tvar_type is CongestionProfile:
-            typeday_list = ast.literal_eval(tvar.traffic_condition)
+            typeday_list = tvar.traffic_condition
         else:
-            typeday_list = ast.literal_eval(tvar.typeday)
+            typeday_list = tvar.typeday
         for i in range(len(typeday_list)):
             if i == 0:
                 row_data = [tvar.name] + [time_intervals[i]] + typeday_list[i]
@@ -412,7 +408,7 @@ def create_timevar_sheet(worksheet, tvar_type):
                 row_data = [""] + [time_intervals[i]] + typeday_list[i]
             worksheet.append(row_data)
         if tvar_type is not CongestionProfile:
-            month_list = ast.literal_eval(tvar.month)
+            month_list = tvar.month
             worksheet.append(months_header)
             worksheet.append(["", ""] + month_list)
 
@@ -1,8 +1,10 @@
 """import activities and emission-factors."""
 
-from django.db import IntegrityError
+import numpy as np
+from django.db import transaction
 
 from cetk.edb.cache import cache_queryset
+from cetk.edb.const import BATCH_SIZE
 from cetk.edb.models import (
     Activity,
     AreaSource,
@@ -17,22 +19,29 @@ from cetk.edb.models import (
 )
 from cetk.edb.units import activity_ef_unit_to_si
 
-from .utils import import_error, worksheet_to_dataframe
+from .utils import bulk_upsert, import_error, worksheet_to_dataframe
 
 
+@transaction.atomic
 def import_emissionfactorsheet(workbook, validation):
     return_dict = {}
     return_message = []
-    activities = cache_queryset(
-        Activity.objects.prefetch_related("emissionfactors").all(), "name"
-    )
-    data = workbook["EmissionFactor"].values
-    df_activity = worksheet_to_dataframe(data)
+    activities = cache_queryset(Activity.objects.all(), "name")
+    # sheets are parsed at most once, also when checked for several activities
+    sheet_frames = {}
+
+    def read_sheet(sheet_name):
+        if sheet_name not in sheet_frames:
+            sheet_frames[sheet_name] = worksheet_to_dataframe(
+                workbook[sheet_name].iter_rows(values_only=True)
+            )
+        return sheet_frames[sheet_name]
+
+    df_activity = read_sheet("EmissionFactor")
 
     activity_names = df_activity["activity_name"]
     update_activities = {}
     create_activities = {}
-    drop_emfacs = []
     for row_nr, activity_name in enumerate(activity_names):
         try:
             activity = activities[activity_name]
@@ -62,9 +71,7 @@ def import_emissionfactorsheet(workbook, validation):
                         ]
                         source_names = [source.name for source in pointsources]
                         if "PointSource" in workbook.sheetnames:
-                            new_pointsources = worksheet_to_dataframe(
-                                workbook["PointSource"].values
-                            )
+                            new_pointsources = read_sheet("PointSource")
                             for facility, source in zip(facility_names, source_names):
                                 row_exists = (
                                     (new_pointsources["source_name"] == source)
@@ -96,9 +103,7 @@ def import_emissionfactorsheet(workbook, validation):
                         ]
                         source_names = [source.name for source in areasources]
                         if "AreaSource" in workbook.sheetnames:
-                            new_areasources = worksheet_to_dataframe(
-                                workbook["AreaSource"].values
-                            )
+                            new_areasources = read_sheet("AreaSource")
                             for facility, source in zip(facility_names, source_names):
                                 row_exists = (
                                     (new_areasources["source_name"] == source)
@@ -127,10 +132,7 @@ def import_emissionfactorsheet(workbook, validation):
                         source_names = [source.name for source in gridsources]
                         if "GridSource" in workbook.sheetnames:
                             update_sources = [
-                                name
-                                in worksheet_to_dataframe(
-                                    workbook["GridSource"].values
-                                )["name"]
+                                name in read_sheet("GridSource")["name"]
                                 for name in gridsources
                             ]
                             if not all(update_sources):
@@ -146,7 +148,6 @@ def import_emissionfactorsheet(workbook, validation):
                             )
                     setattr(activity, "unit", df_activity["activity_unit"][row_nr])
                 update_activities[activity_name] = activity
-                drop_emfacs += list(activities[activity_name].emissionfactors.all())
             elif (
                 df_activity["activity_unit"][row_nr]
                 != update_activities[activity_name].unit
@@ -174,16 +175,14 @@ def import_emissionfactorsheet(workbook, validation):
                             validation=validation,
                         )
                     )
-    Activity.objects.bulk_create(create_activities.values())
+    Activity.objects.bulk_create(create_activities.values(), batch_size=BATCH_SIZE)
     Activity.objects.bulk_update(
-        update_activities.values(),
-        [
-            "name",
-            "unit",
-        ],
+        update_activities.values(), ["unit"], batch_size=BATCH_SIZE
     )
     # drop existing emfacs of activities that will be updated
-    EmissionFactor.objects.filter(pk__in=[inst.id for inst in drop_emfacs]).delete()
+    EmissionFactor.objects.filter(
+        activity_id__in=[activity.id for activity in update_activities.values()]
+    ).delete()
     return_dict.update(
         {
             "activity": {
@@ -192,87 +191,109 @@ def import_emissionfactorsheet(workbook, validation):
             }
         }
     )
-    data = workbook["EmissionFactor"].values
-    df_emfac = worksheet_to_dataframe(data)
+    df_emfac = read_sheet("EmissionFactor")
     substances = cache_queryset(Substance.objects.all(), "slug")
     activities = cache_queryset(Activity.objects.all(), "name")
-    # unique together activity_name and substance
-    emissionfactors = cache_queryset(
-        EmissionFactor.objects.all(), ["activity", "substance"]
-    )
-    update_emfacs = []
-    create_emfacs = []
-    for row_nr in range(len(df_emfac)):
-        activity_name = df_emfac.iloc[row_nr]["activity_name"]
-        try:
-            activity = activities[activity_name]
-            subst = df_emfac.iloc[row_nr]["substance"]
-            try:
-                substance = substances[subst]
-                factor = df_emfac.iloc[row_nr]["factor"]
-                factor_unit = df_emfac.iloc[row_nr]["emissionfactor_unit"]
-                activity_quantity_unit, time_unit = activity.unit.split("/")
-                mass_unit, factor_quantity_unit = factor_unit.split("/")
-                if activity_quantity_unit != factor_quantity_unit:
-                    # emission factor and activity need to have the same unit
-                    # for quantity, eg GJ, m3 "pellets", number of produces bottles
-                    return_message.append(
-                        import_error(
-                            "Units for emission factor and activity rate for"
-                            f" '{activity_name}'"
-                            " are inconsistent, convert units before importing.",
-                            validation=validation,
-                        )
-                    )
-                else:
-                    factor = activity_ef_unit_to_si(factor, factor_unit)
+    emfacs = {}
+    errors = []
+    # unknown activities and substances are found before the loop below,
+    # which only visits rows where both can be resolved
+    activity_names = df_emfac["activity_name"].to_numpy()
+    substs = df_emfac["substance"].replace({"PM2.5": "PM25"}).to_numpy()
+    known_activity = df_emfac["activity_name"].isin(activities).to_numpy()
+    known_substance = np.isin(substs, list(substances))
+    errors += [
+        (
+            row_nr,
+            f"unknown activity '{activity_names[row_nr]}'"
+            f" for emission factor on row '{row_nr}'",
+        )
+        for row_nr in np.flatnonzero(~known_activity)
+    ]
+    errors += [
+        (
+            row_nr,
+            f"unknown substance '{substs[row_nr]}'"
+            f" for emission factor on row '{row_nr}'",
+        )
+        for row_nr in np.flatnonzero(known_activity & ~known_substance)
+    ]
+    # units are split once for each activity and each emission factor unit
+    activity_units = {
+        name: activity.unit.split("/") for name, activity in activities.items()
+    }
+    ef_units = {}
+    # conversion factor to si-units, evaluated once for each emission factor unit
+    ef_unit_factors = {}
+    # extract columns as arrays once, to avoid indexing the dataframe per row
+    factors = df_emfac["factor"].to_numpy()
+    factor_units = df_emfac["emissionfactor_unit"].to_numpy()
+    for row_nr in np.flatnonzero(known_activity & known_substance):
+        activity_name = activity_names[row_nr]
+        activity = activities[activity_name]
+        substance = substances[substs[row_nr]]
+        factor = factors[row_nr]
+        factor_unit = factor_units[row_nr]
+        activity_quantity_unit, time_unit = activity_units[activity_name]
+        if factor_unit not in ef_units:
+            ef_units[factor_unit] = factor_unit.split("/")
+        mass_unit, factor_quantity_unit = ef_units[factor_unit]
+        if activity_quantity_unit != factor_quantity_unit:
+            # emission factor and activity need to have the same unit
+            # for quantity, eg GJ, m3 "pellets", number of produces bottles
+            errors.append(
+                (
+                    row_nr,
+                    "Units for emission factor and activity rate for"
+                    f" '{activity_name}'"
+                    " are inconsistent, convert units before importing.",
+                )
+            )
+        else:
+            if factor_unit not in ef_unit_factors:
                 try:
-                    emfac = emissionfactors[(activity, substance)]
-                    setattr(emfac, "activity", activity)
-                    setattr(emfac, "substance", substance)
-                    setattr(emfac, "factor", factor)
-                    update_emfacs.append(emfac)
-                except KeyError:
-                    emfac = EmissionFactor(
-                        activity=activity, substance=substance, factor=factor
+                    ef_unit_factors[factor_unit] = activity_ef_unit_to_si(
+                        1.0, factor_unit
                     )
-                    create_emfacs.append(emfac)
-            except KeyError:
-                if subst == "PM2.5":
-                    substance = substances["PM25"]
-                else:
-                    return_message.append(
-                        import_error(
-                            f"unknown substance '{subst}'"
+                except KeyError:
+                    errors.append(
+                        (
+                            row_nr,
+                            f"unknown mass-unit '{mass_unit}'"
                             f" for emission factor on row '{row_nr}'",
-                            validation=validation,
                         )
                     )
-        except KeyError:
-            return_message.append(
-                import_error(
-                    f"unknown activity '{activity_name}'"
-                    f" for emission factor on row '{row_nr}'",
-                    validation=validation,
+                    continue
+            factor = factor * ef_unit_factors[factor_unit]
+        if (activity, substance) in emfacs:
+            errors.append(
+                (
+                    row_nr,
+                    "Two emission factors for same activity and substance"
+                    f" on row '{row_nr}'",
                 )
             )
-    try:
-        EmissionFactor.objects.bulk_create(create_emfacs)
-    except IntegrityError:
-        return_message.append(
-            import_error(
-                "Two emission factors for same activity and substance are given.",
-                validation=validation,
-            )
+            continue
+        emfacs[activity, substance] = EmissionFactor(
+            activity=activity, substance=substance, factor=factor
         )
-    EmissionFactor.objects.bulk_update(
-        update_emfacs, ["activity", "substance", "factor"]
+    # errors are collected as (row_nr, message) and reported in row order
+    errors.sort(key=lambda error: error[0])
+    return_message += [
+        import_error(message, validation=validation) for row_nr, message in errors
+    ]
+    # existing emission factors are updated in the same statement
+    nr_created, nr_updated = bulk_upsert(
+        EmissionFactor,
+        list(emfacs.values()),
+        unique_fields=["activity", "substance"],
+        update_fields=["factor"],
     )
     return_dict.update(
         {
             "emission_factors": {
-                "updated": len(update_emfacs),
-                "created": len(create_emfacs),
+                "updated": nr_updated,
+                "created": nr_created,
             }
         }
     )
@@ -1,13 +1,17 @@
+from django.db import transaction
+
+from cetk.edb.const import BATCH_SIZE
 from cetk.edb.models import ActivityCode, CodeSet, VerticalDist
 
 from .utils import import_error, worksheet_to_dataframe
 
 
+@transaction.atomic
 def import_codesetsheet(workbook, validation):
     return_message = []
     return_dict = {}
     nr_codesets = CodeSet.objects.count()
-    data = workbook["CodeSet"].values
+    data = workbook["CodeSet"].iter_rows(values_only=True)
     df_codeset = worksheet_to_dataframe(data)
     slugs = df_codeset["slug"]
     update_codesets = []
@@ -35,13 +39,14 @@ def import_codesetsheet(workbook, validation):
                     )
                 )
 
-    CodeSet.objects.bulk_create(create_codesets.values())
+    CodeSet.objects.bulk_create(create_codesets.values(), batch_size=BATCH_SIZE)
     CodeSet.objects.bulk_update(
         update_codesets,
         [
             "name",
             "description",
         ],
+        batch_size=BATCH_SIZE,
     )
     return_dict = {
         "codeset": {
@@ -52,14 +57,17 @@ def import_codesetsheet(workbook, validation):
     return return_dict, return_message
 
 
+@transaction.atomic
 def import_activitycodesheet(workbook, validation):
     return_message = []
-    data = workbook["ActivityCode"].values
+    data = workbook["ActivityCode"].iter_rows(values_only=True)
     df_activitycode = worksheet_to_dataframe(data)
     update_activitycodes = []
     create_activitycodes = {}
-    for row_key, row in df_activitycode.iterrows():
-        row_dict = row.to_dict()
+    columns = df_activitycode.columns.tolist()
+    # plain tuples avoid creating a series for each row
+    for row_key, *values in df_activitycode.itertuples(index=True, name=None):
+        row_dict = dict(zip(columns, values))
         try:
             codeset = CodeSet.objects.get(slug=row_dict["codeset_slug"])
             if "vertical_distribution_slug" in row_dict:
@@ -107,13 +115,16 @@ def import_activitycodesheet(workbook, validation):
                     validation=validation,
                 )
             )
-    ActivityCode.objects.bulk_create(create_activitycodes.values())
+    ActivityCode.objects.bulk_create(
+        create_activitycodes.values(), batch_size=BATCH_SIZE
+    )
     ActivityCode.objects.bulk_update(
         update_activitycodes,
         [
             "label",
             "vertical_dist_id",
         ],
+        batch_size=BATCH_SIZE,
     )
     return_dict = {
         "activitycode": {
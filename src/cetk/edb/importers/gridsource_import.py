@@ -1,4 +1,5 @@
 import logging
+from itertools import chain
 from os.path import dirname
 
 import numpy as np
@@ -7,9 +8,12 @@ import rasterio as rio
 from openpyxl import load_workbook
 
 from cetk.edb.cache import cache_queryset
+from cetk.edb.const import BATCH_SIZE
 from cetk.edb.models import (
     Activity,
     GridSource,
+    GridSourceActivity,
+    GridSourceSubstance,
     Substance,
     Timevar,
     drop_gridsource_raster,
@@ -68,7 +72,7 @@ def read_xlsx(filepath):
         raise ImportError("no 'GridSource' sheet found")
 
     worksheet = workbook["GridSource"]
-    data = worksheet.values
+    data = worksheet.iter_rows(values_only=True)
     df = worksheet_to_dataframe(data)
     df = df.astype(dtype="string")
     workbook.close()
@@ -195,6 +199,10 @@ def import_gridsources(filepath, encoding=None):
 
     subst_cols = get_substance_emission_columns(df)
     act_cols = get_activity_rate_columns(df)
+    # emissions are written in bulk after all sources have been saved
+    updated_source_ids = []
+    source_substances = {}
+    source_activities = {}
     for name, row in df.iterrows():
         row_dict = nan2None(row.to_dict())
         src, created = GridSource.objects.get_or_create(name=name)
@@ -211,11 +219,11 @@ def import_gridsources(filepath, encoding=None):
         validate_timevar(row_dict, timevars, row_nr, src)
         src.save()
 
-        # remove any existing emissions
+        # existing emissions are replaced
         if not created:
-            src.substances.all().delete()
-            src.activities.all().delete()
+            updated_source_ids.append(src.id)
 
+        source_substances[name] = []
         for col in filter(lambda x: row_dict[x] is not None, subst_cols):
             subst = col[6:]
             # if sum is specified instead of an emission total,
@@ -230,8 +238,9 @@ def import_gridsources(filepath, encoding=None):
                 emis["value"] = emission_unit_to_si(rasters[rname]["sum"], unit)
             else:
                 emis["value"] = emission_unit_to_si(float(emis_value), unit)
-            src.substances.create(**emis)
+            source_substances[name].append(GridSourceSubstance(source=src, **emis))
 
+        source_activities[name] = []
         for col in filter(lambda x: row_dict[x] is not None, act_cols):
             activity_name = col[4:]
             rname, rpath = data_to_raster(
@@ -247,9 +256,18 @@ def import_gridsources(filepath, encoding=None):
                 emis["rate"] = activity_rate_unit_to_si(
                     float(rate), emis["activity"].unit
                 )
-            src.activities.create(**emis)
+            source_activities[name].append(GridSourceActivity(source=src, **emis))
 
         row_nr += 1
+
+    GridSourceSubstance.objects.filter(source_id__in=updated_source_ids).delete()
+    GridSourceActivity.objects.filter(source_id__in=updated_source_ids).delete()
+    GridSourceSubstance.objects.bulk_create(
+        chain.from_iterable(source_substances.values()), batch_size=BATCH_SIZE
+    )
+    GridSourceActivity.objects.bulk_create(
+        chain.from_iterable(source_activities.values()), batch_size=BATCH_SIZE
+    )
     db_updates = {
         "gridsources": {"updated": nr_updated_sources, "created": nr_created_sources}
     }
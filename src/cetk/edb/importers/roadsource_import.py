@@ -1,3 +1,4 @@
+import ast
 import copy
 import logging
 import os
@@ -19,7 +20,7 @@ from django.core.management.base import CommandError  # noqa
 from django.db import IntegrityError  # noqa
 from openpyxl import load_workbook
 
-from cetk.edb.const import WGS84_SRID
+from cetk.edb.const import BATCH_SIZE, WGS84_SRID
 from cetk.edb.models import ColdstartTimevar  # noqa
 from cetk.edb.models import (
     CodeSet,
@@ -223,7 +224,9 @@ def import_traffic(filename, sheets, validation=False):
         )
         raise ImportError
     if "VehicleEmissionFactor" in sheets:
-        df = worksheet_to_dataframe(workbook["VehicleEmissionFactor"].values)
+        df = worksheet_to_dataframe(
+            workbook["VehicleEmissionFactor"].iter_rows(values_only=True)
+        )
         unit = set(df["unit"])
         if len(unit) > 1:
             return_message.append(
@@ -427,7 +430,7 @@ def import_vehicles(  # noqa: C901, PLR0912, PLR0915
                 substances[subst] = Substance.objects.get(slug=subst)
             except ObjectDoesNotExist:
                 msg = f"substance {subst} does not exist in database"
-                return_message.append(import_error(msg), validation=validation)
+                import_error(msg, validation=validation, sink=return_message)
 
         # create vehicles
         vehicle_defs = config.get("vehicles", [])
@@ -602,7 +605,7 @@ def import_vehicles(  # noqa: C901, PLR0912, PLR0915
             traffic_situations.append(TrafficSituation(ts_id=ts_id))
     # create any new traffic-situations
     if len(traffic_situations) > 0:
-        TrafficSituation.objects.bulk_create(traffic_situations)
+        TrafficSituation.objects.bulk_create(traffic_situations, batch_size=BATCH_SIZE)
 
     # update look-up dict for traffic-situations
     updated_traffic_situations = {ts.ts_id: ts for ts in TrafficSituation.objects.all()}
@@ -716,6 +719,7 @@ def import_vehicles(  # noqa: C901, PLR0912, PLR0915
         VehicleEF.objects.bulk_update(
             efs_to_update,
             ("freeflow", "heavy", "saturated", "stopngo", "coldstart"),
+            batch_size=BATCH_SIZE,
         )
         log.debug(f"updated {len(efs_to_update)} emission-factors")
         return_dict = {"vehicle_emission_factors": {"updated": len(efs_to_update)}}
@@ -726,7 +730,7 @@ def import_vehicles(  # noqa: C901, PLR0912, PLR0915
 
     if len(efs_to_create) > 0:
         try:
-            VehicleEF.objects.bulk_create(efs_to_create)
+            VehicleEF.objects.bulk_create(efs_to_create, batch_size=BATCH_SIZE)
             log.debug(f"wrote {len(efs_to_create)} emission-factors")
             return_dict["vehicle_emission_factors"]["created"] = len(efs_to_create)
         except IntegrityError:
@@ -919,7 +923,9 @@ def import_roadclasses(  # noqa: C901, PLR0912, PLR0915
                         )
                     )
         if len(roadclasses_to_create) > 0:
-            RoadClass.objects.bulk_create(map(itemgetter(0), roadclasses_to_create))
+            RoadClass.objects.bulk_create(
+                map(itemgetter(0), roadclasses_to_create), batch_size=BATCH_SIZE
+            )
             # list of saved roadclasses to avoid problem unsaved related attributes
             roadclasses_to_create_saved = []
             # created roadclasses should only be those who have no attribute values yet!
@@ -937,11 +943,11 @@ def import_roadclasses(  # noqa: C901, PLR0912, PLR0915
                 for v in vals
             ]
 
-            through_model.objects.bulk_create(values)
+            through_model.objects.bulk_create(values, batch_size=BATCH_SIZE)
 
 
 def import_congestionsheet(workbook, sheetname="CongestionProfile", validation=False):
-    congestion_data = workbook[sheetname].values
+    congestion_data = workbook[sheetname].iter_rows(values_only=True)
     df_congestion = worksheet_to_dataframe(congestion_data)
     congestion_dict = {}
     # NB this only works if Excel file has exact same format
@@ -980,12 +986,10 @@ def import_congestion_profiles(profile_data, *, overwrite=False, validation=Fals
         for name, timevar_data in data.items():
             try:
                 traffic_condition = timevar_data["traffic_condition"]
-                if type(traffic_condition) == list:
-                    traffic_condition = str(traffic_condition)
-                else:
-                    traffic_condition = np.array2string(
-                        traffic_condition, separator=","
-                    ).replace("\n", "")
+                if isinstance(traffic_condition, str):
+                    traffic_condition = ast.literal_eval(traffic_condition)
+                elif not isinstance(traffic_condition, list):
+                    traffic_condition = np.asarray(traffic_condition).tolist()
                 if overwrite:
                     newobj = CongestionProfile.objects.update_or_create(
                         name=name,
@@ -1191,7 +1195,7 @@ def import_fleets(
                         validation=validation,
                     )
                 )
-            FleetMemberFuel.objects.bulk_create(member_fuels)
+            FleetMemberFuel.objects.bulk_create(member_fuels, batch_size=BATCH_SIZE)
         if heavy_member_sum > 0 and abs(heavy_member_sum - 1.0) >= 0.005:
             return_message.append(
                 import_error(
@@ -1587,7 +1591,7 @@ def import_roads(  # noqa: C901, PLR0912, PLR0915
             except ValidationError:
                 continue
             roads.append(road)
-        RoadSource.objects.bulk_create(roads)
+        RoadSource.objects.bulk_create(roads, batch_size=BATCH_SIZE)
         ncreated += len(roads)
         roads = []
         if progress_callback:
@@ -1,13 +1,17 @@
 """Data importers for the edb application."""
 
+from collections import Counter
+
 import numpy as np
 import pandas as pd
 from django.contrib.gis.geos import GEOSGeometry, Point
+from django.db import transaction
 from openpyxl import load_workbook
+from pyproj import Transformer
 
 from cetk import logging
 from cetk.edb.cache import cache_queryset
-from cetk.edb.const import SHEET_NAMES, WGS84_SRID
+from cetk.edb.const import BATCH_SIZE, SHEET_NAMES, WGS84_SRID
 from cetk.edb.models import (
     Activity,
     AreaSource,
@@ -26,7 +30,16 @@ from cetk.edb.units import activity_rate_unit_to_si, emission_unit_to_si
 from .activity_import import import_emissionfactorsheet
 from .codeset_import import import_activitycodesheet, import_codesetsheet
 from .timevar_import import import_timevarsheet
-from .utils import cache_codeset, import_error, worksheet_to_dataframe
+from .utils import (
+    bulk_upsert,
+    cache_activitycodes,
+    calamine_sheet_values,
+    get_activity_rate_columns,
+    get_substance_emission_columns,
+    import_error,
+    use_calamine,
+    worksheet_to_dataframe,
+)
 
 # from cetk.edb.models.common_models import Settings
 # import sys
@@ -80,6 +93,31 @@ OPTIONAL_COLUMNS_POINT = {
     "house_height": float,
 }
 
+# pointsource chimney attributes and corresponding columns
+CHIMNEY_COLUMNS = {
+    "chimney_height": "chimney_height",
+    "chimney_inner_diameter": "inner_diameter",
+    "chimney_outer_diameter": "outer_diameter",
+    "chimney_gas_speed": "gas_speed",
+    "chimney_gas_temperature": "gas_temperature[K]",
+}
+
+# optional pointsource attributes set from source sheet
+POINTSOURCE_ATTRIBUTES = {*CHIMNEY_COLUMNS, "house_width", "house_height"}
+
+# pointsource columns converted to float when creating sources
+NUMERIC_COLUMNS_POINT = ["lat", "lon", *CHIMNEY_COLUMNS.values()]
+DOWNDRAFT_COLUMNS = ["house_width", "house_height"]
+
+
+def text_dtypes(columns):
+    """Return dtypes of the columns that are not numeric.
+
+    Numeric columns are converted when sources are created, where invalid
+    values are reported for each row instead of failing the whole import.
+    """
+    return {key: dtype for key, dtype in columns.items() if dtype is not float}
+
 
 log = logging.getLogger(__name__)
 
@@ -88,13 +126,85 @@ def cache_sources(queryset):
     """Return dict of model instances with (facility__official_id, name): instance"""
     sources = {}
     for source in queryset:
-        if source.facility is not None:
-            sources[source.facility.official_id, source.name] = source
-        else:
-            sources[None, source.name] = source
+        official_id = source.facility.official_id if source.facility_id else None
+        sources[official_id, source.name] = source
     return sources
 
 
+def cache_source_ids(queryset):
+    """Return dict of source ids with (facility__official_id, name): id"""
+    return {
+        (official_id, name): source_id
+        for official_id, name, source_id in queryset.values_list(
+            "facility__official_id", "name", "id"
+        )
+    }
+
+
+def update_source(source, source_data):
+    """Assign data from a row in a source sheet to an existing source."""
+    source.geom = source_data["geom"]
+    source.facility = source_data["facility"]
+    source.tags = source_data["tags"]
+    source.activitycode1 = source_data["activitycode1"]
+    source.activitycode2 = source_data["activitycode2"]
+    source.activitycode3 = source_data["activitycode3"]
+    # optional attributes are only updated when specified in sheet
+    if "timevar" in source_data:
+        source.timevar = source_data["timevar"]
+    for attr in POINTSOURCE_ATTRIBUTES.intersection(source_data):
+        setattr(source, attr, source_data[attr])
+
+
+def set_source_ids(model, source_substances):
+    """Set source_id of source substances after sources are bulk-created.
+
+    Primary keys are set by bulk_create if supported by the database backend,
+    otherwise created sources are fetched with a single query.
+    """
+    if any(emis.source.pk is None for emis in source_substances):
+        source_ids = {
+            (name, facility_id): pk
+            for pk, name, facility_id in model.objects.values_list(
+                "id", "name", "facility_id"
+            )
+        }
+    for emis in source_substances:
+        source = emis.source
+        if source.pk is not None:
+            emis.source_id = source.pk
+        else:
+            emis.source_id = source_ids[source.name, source.facility_id]
+
+
+def get_active_activity_keys(df, activities, validation=False):
+    """Return activity rate columns holding data for known activities.
+
+    Columns without any value are skipped and unknown activities are
+    reported once per column rather than once per row.
+
+    returns (activity_keys, messages)
+    """
+    messages = []
+    activity_keys = get_activity_rate_columns(df)
+    if len(activity_keys) == 0:
+        return activity_keys, messages
+    col_has_data = df[activity_keys].notna().any()
+    active_keys = []
+    for activity_key in activity_keys:
+        if not col_has_data[activity_key]:
+            continue
+        if activity_key[4:] not in activities:
+            messages.append(
+                import_error(
+                    f"unknown activity '{activity_key[4:]}'", validation=validation
+                )
+            )
+            continue
+        active_keys.append(activity_key)
+    return active_keys, messages
+
+
 def import_sources(
     filepath,
     validation=False,
@@ -124,7 +234,7 @@ def import_sources(
                     sep=";",
                     skip_blank_lines=True,
                     comment="#",
-                    dtype=REQUIRED_COLUMNS_POINT,
+                    dtype=text_dtypes(REQUIRED_COLUMNS_POINT),
                 )
         else:
             with open(filepath, encoding=encoding or "utf-8") as csvfile:
@@ -136,28 +246,33 @@ def import_sources(
                     comment="#",
                     dtype=REQUIRED_COLUMNS_AREA,
                 )
+    elif extension == ".xlsx" and use_calamine(filepath):
+        log.debug("reading large spreadsheet using python-calamine")
+        sheetname = "PointSource" if sourcetype == "point" else "AreaSource"
+        df = worksheet_to_dataframe(calamine_sheet_values(filepath, sheetname))
     elif extension == ".xlsx":
         # read spreadsheet
         try:
             workbook = load_workbook(filename=filepath, data_only=True, read_only=True)
         except Exception as exc:
             return_message.append(import_error(str(exc), validation))
-        worksheet = workbook.worksheets[0]
-        if len(workbook.worksheets) > 1:
-            if sourcetype == "point":
-                log.debug(
-                    "Multiple sheets in spreadsheet, importing sheet 'PointSource'."
-                )
-                data = workbook["PointSource"].values
-            elif sourcetype == "area":
-                log.debug(
-                    "Multiple sheets in spreadsheet, importing sheet 'AreaSource'."
-                )
-                data = workbook["AreaSource"].values
-        else:
-            data = worksheet.values
-        df = worksheet_to_dataframe(data)
-        workbook.close()
+        try:
+            worksheet = workbook.worksheets[0]
+            if len(workbook.worksheets) > 1:
+                if sourcetype == "point":
+                    log.debug(
+                        "Multiple sheets in spreadsheet, importing sheet 'PointSource'."
+                    )
+                    worksheet = workbook["PointSource"]
+                elif sourcetype == "area":
+                    log.debug(
+                        "Multiple sheets in spreadsheet, importing sheet 'AreaSource'."
+                    )
+                    worksheet = workbook["AreaSource"]
+            # stream cell values row by row, without creating cell objects
+            df = worksheet_to_dataframe(worksheet.iter_rows(values_only=True))
+        finally:
+            workbook.close()
     else:
         return_message.append(
             import_error(
@@ -171,29 +286,31 @@ def import_sources(
     return create_or_update_sources(
         df,
         validation=validation,
-        srid=None,
+        srid=srid,
         sourcetype=sourcetype,
     )
 
 
 def set_datatypes(df, sourcetype):
     if sourcetype == "point":
-        df = df.astype(dtype=REQUIRED_COLUMNS_POINT)
+        df = df.astype(dtype=text_dtypes(REQUIRED_COLUMNS_POINT))
         optional_columns = {
             k: OPTIONAL_COLUMNS_POINT[k]
             for k in OPTIONAL_COLUMNS_POINT
             if k in df.columns
         }
-        df = df.astype(dtype=optional_columns)
+        df = df.astype(dtype=text_dtypes(optional_columns))
     else:
         df = df.astype(dtype=REQUIRED_COLUMNS_AREA)
     # below is necessary not to create facilities with name 'None'
-    df = df.replace(to_replace="None", value=None)
-    df = df.replace(to_replace="nan", value=None)
+    # only object columns can hold the strings produced when casting nulls
+    for col in df.select_dtypes(include="object").columns:
+        df[col] = df[col].mask(df[col].isin(["None", "nan"]), None)
     return df
 
 
 # @profile
+@transaction.atomic
 def create_or_update_sources(
     df,
     validation=False,
@@ -213,13 +330,15 @@ def create_or_update_sources(
 
     if cache:
         if sourcetype == "point":
+            # geometries are always replaced on update and need not be loaded
             sources = cache_sources(
-                PointSource.objects.select_related("facility").all()
-            )  # .prefetch_related("substances")
+                PointSource.objects.select_related("facility").defer("geom")
+            )
         elif sourcetype == "area":
+            # geometries are always replaced on update and need not be loaded
             sources = cache_sources(
-                AreaSource.objects.select_related("facility").all()
-            )  # .prefetch_related("substances")
+                AreaSource.objects.select_related("facility").defer("geom")
+            )
         else:
             return_message.append(
                 import_error(
@@ -228,16 +347,10 @@ def create_or_update_sources(
                 )
             )
 
-    code_sets = [
-        cache_codeset(CodeSet.objects.filter(id=i).first()) for i in range(1, 4)
-    ]
-    code_set_slugs = {}
-    for i in range(1, 4):
-        try:
-            code_set_slug = CodeSet.objects.get(id=i).slug
-        except CodeSet.DoesNotExist:
-            code_set_slug = None
-        code_set_slugs[i] = code_set_slug
+    activitycodes = cache_activitycodes([1, 2, 3])
+    code_sets = [activitycodes[i] for i in range(1, 4)]
+    known_codeset_slugs = dict(CodeSet.objects.values_list("id", "slug"))
+    code_set_slugs = {i: known_codeset_slugs.get(i) for i in range(1, 4)}
 
     if sourcetype == "point":
         for col in REQUIRED_COLUMNS_POINT.keys():
@@ -256,28 +369,94 @@ def create_or_update_sources(
                     )
                 )
 
-    # set dataframe index
-    try:
-        df.set_index(
-            ["facility_id", "source_name"], verify_integrity=True, inplace=True
+    # set dataframe index, duplicates are found in the same pass for all rows
+    duplicates = df.duplicated(subset=["facility_id", "source_name"], keep=False)
+    if duplicates.any():
+        duplicate_keys = list(
+            df.loc[duplicates, ["facility_id", "source_name"]]
+            .drop_duplicates()
+            .itertuples(index=False, name=None)
         )
-    except ValueError as err:
         return_message.append(
             import_error(
-                f"Non-unique combination of facility_id and source_name: {err}",
+                "Non-unique combination of facility_id and source_name: "
+                f"{duplicate_keys}",
                 validation=validation,
             )
         )
+    df.set_index(["facility_id", "source_name"], inplace=True)
     update_facilities = []
     create_facilities = {}
-    drop_substances = []
     create_substances = []
     update_sources = []
     create_sources = {}
     activitycode_columns = [key for key in df.columns if key.startswith("activitycode")]
+    code_attributes = {
+        code_ind: f"activitycode_{code_set_slug}"
+        for code_ind, code_set_slug in code_set_slugs.items()
+        if code_set_slug is not None
+    }
+    # activitycode columns for codesets that do not exist in inventory
+    unknown_codeset_columns = [
+        (column, column.split("_", 1)[-1])
+        for column in activitycode_columns
+        if column.split("_", 1)[-1] not in known_codeset_slugs.values()
+    ]
+    # column names paired with tag names and substance slugs
+    tag_columns = [(key, key[4:]) for key in df.columns if key.startswith("tag:")]
+    subst_columns = [(key, key[6:]) for key in get_substance_emission_columns(df)]
+    # extract columns as arrays once, to avoid creating a series for each row
+    cols = {key: df[key].to_numpy() for key in df.columns}
+    # null masks for all columns, evaluated vectorized instead of per value
+    missing = {key: df[key].isna().to_numpy() for key in df.columns}
+    official_facility_ids = df.index.get_level_values(0).to_numpy()
+    source_names = df.index.get_level_values(1).to_numpy()
+    missing_facility_ids = pd.isna(official_facility_ids)
+    missing_source_names = pd.isna(source_names)
+    if sourcetype == "point":
+        # numeric columns are converted once, invalid values become nan
+        numeric = {
+            key: pd.to_numeric(df[key], errors="coerce").to_numpy(dtype=float)
+            for key in NUMERIC_COLUMNS_POINT
+            + [key for key in DOWNDRAFT_COLUMNS if key in df.columns]
+        }
+        # transform all coordinates in one call instead of one point at a time
+        xs = numeric["lon"]
+        ys = numeric["lat"]
+        if srid != WGS84_SRID:
+            transformer = Transformer.from_crs(srid, WGS84_SRID, always_xy=True)
+            xs, ys = transformer.transform(xs, ys)
+        missing_coords = missing["lat"] | missing["lon"]
+        invalid_coords = ~(np.isfinite(xs) & np.isfinite(ys))
+        # rows with all chimney properties given take a fast path in the loop
+        chimney_values = [(attr, numeric[key]) for attr, key in CHIMNEY_COLUMNS.items()]
+        incomplete_chimney = np.logical_or.reduce(
+            [~np.isfinite(numeric[key]) for key in CHIMNEY_COLUMNS.values()]
+        )
+    elif sourcetype == "area":
+        # polygons are given as WKT, the srid is prepended to parse them as EWKT
+        ewkt_prefix = f"SRID={srid};"
+    # conversion factor to si-units, evaluated once for each emission unit
+    emission_unit_scales = {}
+    emission_unit_errors = {}
+    if "emission_unit" in cols:
+        for unit in set(cols["emission_unit"][~missing["emission_unit"]]):
+            try:
+                emission_unit_scales[unit] = emission_unit_to_si(1.0, unit)
+            except (ValueError, KeyError) as err:
+                emission_unit_errors[unit] = err
+        scales = df["emission_unit"].map(emission_unit_scales).to_numpy(dtype=float)
+    else:
+        scales = np.full(len(df), np.nan)
+    # emissions in si-units, nan for missing or invalid values and units
+    emission_values = {
+        subst_key: pd.to_numeric(df[subst_key], errors="coerce").to_numpy(dtype=float)
+        * scales
+        for subst_key, _ in subst_columns
+    }
     row_nr = 2
-    for row_key, row in df.iterrows():
-        row_dict = row.to_dict()
+    for i in range(len(df)):
+        row_key = (official_facility_ids[i], source_names[i])
 
         # initialize activitycodes
         source_data = {
@@ -288,68 +467,78 @@ def create_or_update_sources(
 
         if sourcetype == "point":
             # get pointsource coordinates
-            try:
-                if pd.isna(row_dict["lat"]) or pd.isna(row_dict["lon"]):
-                    return_message.append(
-                        import_error(
-                            f"missing coordinates for source '{row_key}'",
-                            validation=validation,
-                        )
+            if missing_coords[i]:
+                return_message.append(
+                    import_error(
+                        f"missing coordinates for source '{row_key}'",
+                        validation=validation,
                     )
-                x = float(row_dict["lon"])
-                y = float(row_dict["lat"])
-            except ValueError:
+                )
+            elif invalid_coords[i]:
                 return_message.append(
                     import_error(
                         f"Invalid {sourcetype} coordinates on row {row_nr}",
                         validation=validation,
                     )
                 )
+            if missing_coords[i] or invalid_coords[i]:
+                # no source is created without a valid position
+                row_nr += 1
+                continue
             # create geometry
-            source_data["geom"] = Point(x, y, srid=srid).transform(4326, clone=True)
+            source_data["geom"] = Point(xs[i], ys[i], srid=WGS84_SRID)
             # get chimney properties
-            for attr, key in {
-                "chimney_height": "chimney_height",
-                "chimney_inner_diameter": "inner_diameter",
-                "chimney_outer_diameter": "outer_diameter",
-                "chimney_gas_speed": "gas_speed",
-                "chimney_gas_temperature": "gas_temperature[K]",
-            }.items():
-                if pd.isna(row_dict[key]):
-                    return_message.append(
-                        import_error(
-                            "Missing value in PointSource sheet "
-                            f"for {key} on row {row_nr}",
-                            validation=validation,
+            if not incomplete_chimney[i]:
+                for attr, values in chimney_values:
+                    source_data[attr] = values[i]
+            else:
+                for attr, key in CHIMNEY_COLUMNS.items():
+                    if missing[key][i]:
+                        return_message.append(
+                            import_error(
+                                "Missing value in PointSource sheet "
+                                f"for {key} on row {row_nr}",
+                                validation=validation,
+                            )
                         )
-                    )
-                else:
-                    source_data[attr] = row_dict[key]
+                    elif not np.isfinite(numeric[key][i]):
+                        return_message.append(
+                            import_error(
+                                "Invalid value in PointSource sheet "
+                                f"for {key} on row {row_nr}",
+                                validation=validation,
+                            )
+                        )
+                    else:
+                        source_data[attr] = numeric[key][i]
 
             # get downdraft parameters
-            try:
-                if not pd.isna(row_dict["house_width"]):
-                    source_data["house_width"] = row_dict["house_width"]
-            except KeyError:
-                if row_nr == 2:
-                    log.debug("house_width is skipped from import.")
-            try:
-                if not pd.isna(row_dict["house_height"]):
-                    source_data["house_height"] = row_dict["house_height"]
-            except KeyError:
-                if row_nr == 2:
-                    log.debug("house_heigth is skipped from import.")
+            for key in DOWNDRAFT_COLUMNS:
+                if key not in numeric:
+                    if row_nr == 2:
+                        log.debug(f"{key} is skipped from import.")
+                elif not missing[key][i]:
+                    if np.isfinite(numeric[key][i]):
+                        source_data[key] = numeric[key][i]
+                    else:
+                        return_message.append(
+                            import_error(
+                                "Invalid value in PointSource sheet "
+                                f"for {key} on row {row_nr}",
+                                validation=validation,
+                            )
+                        )
 
         elif sourcetype == "area":
             try:
-                if pd.isna(row_dict["geometry"]):
+                if missing["geometry"][i]:
                     return_message.append(
                         import_error(
                             f"missing area polygon for source '{row_key}'",
                             validation=validation,
                         )
                     )
-                wkt_polygon = row_dict["geometry"]
+                wkt_polygon = cols["geometry"][i]
                 # TODO add check that valid WKT polygon
             except ValueError:
                 return_message.append(
@@ -358,7 +547,10 @@ def create_or_update_sources(
                         validation=validation,
                     )
                 )
-            source_data["geom"] = GEOSGeometry(f"SRID={4326};" + wkt_polygon)
+            geom = GEOSGeometry(ewkt_prefix + wkt_polygon)
+            if srid != WGS84_SRID:
+                geom.transform(WGS84_SRID)
+            source_data["geom"] = geom
         else:
             return_message.append(
                 import_error(
@@ -368,68 +560,55 @@ def create_or_update_sources(
 
         # get activitycodes
         for code_ind, code_set in enumerate(code_sets, 1):
-            try:
-                code_set_slug = code_set_slugs[code_ind]
-                code_attribute = f"activitycode_{code_set_slug}"
-                if code_attribute in row_dict:
-                    code = row_dict[code_attribute]
-                    if len(code_set) == 0:
-                        if code is not None and code is not np.nan:
-                            return_message.append(
-                                import_error(
-                                    f"Unknown activitycode_{code_set_slug} '{code}'"
-                                    f" for {sourcetype} source on row {row_nr}",
-                                    validation=validation,
-                                )
-                            )
-                    if not pd.isna(code):
-                        try:
-                            # note this can be problematic with codes 01 etc as SNAP
-                            # TODO activitycodes should be string directly on import!
-                            activity_code = code_set[str(code)]
-                            codeset_id = activity_code.code_set_id
-                            source_data[f"activitycode{codeset_id}"] = activity_code
-                        except KeyError:
-                            return_message.append(
-                                import_error(
-                                    f"Unknown activitycode_{code_set_slug} '{code}'"
-                                    f" for {sourcetype} source on row {row_nr}",
-                                    validation=validation,
-                                )
-                            )
-            except AttributeError:
-                # no such codeset exists
-                if len(activitycode_columns) > CodeSet.objects.count():
-                    # need to check if activitycode is specified for unimported codeset
-                    codeset_slug = [
-                        column.split("_", 1)[-1] for column in activitycode_columns
-                    ]
-                    for index, column in enumerate(activitycode_columns):
-                        if not pd.isna(row_dict[column]):
-                            try:
-                                CodeSet.objects.get(slug=codeset_slug[index])
-                            except CodeSet.DoesNotExist:
-                                return_message.append(
-                                    import_error(
-                                        "Specified activitycode "
-                                        f"{row_dict[column]} for "
-                                        f" unknown codeset {codeset_slug[index]}"
-                                        f" for {sourcetype} source on row {row_nr}",
-                                        validation=validation,
-                                    )
-                                )
-                pass
-
-        # get columns with tag values for the current row
-        tag_keys = [key for key in row_dict.keys() if key.startswith("tag:")]
+            code_attribute = code_attributes.get(code_ind)
+            if code_attribute is None or code_attribute not in cols:
+                continue
+            code_set_slug = code_set_slugs[code_ind]
+            code = cols[code_attribute][i]
+            if len(code_set) == 0:
+                if not missing[code_attribute][i]:
+                    return_message.append(
+                        import_error(
+                            f"Unknown activitycode_{code_set_slug} '{code}'"
+                            f" for {sourcetype} source on row {row_nr}",
+                            validation=validation,
+                        )
+                    )
+            if not missing[code_attribute][i]:
+                try:
+                    # note this can be problematic with codes 01 etc as SNAP
+                    # TODO activitycodes should be string directly on import!
+                    activity_code = code_set[str(code)]
+                    codeset_id = activity_code.code_set_id
+                    source_data[f"activitycode{codeset_id}"] = activity_code
+                except KeyError:
+                    return_message.append(
+                        import_error(
+                            f"Unknown activitycode_{code_set_slug} '{code}'"
+                            f" for {sourcetype} source on row {row_nr}",
+                            validation=validation,
+                        )
+                    )
+        # check if activitycode is specified for unimported codeset
+        for column, codeset_slug in unknown_codeset_columns:
+            if not missing[column][i]:
+                return_message.append(
+                    import_error(
+                        f"Specified activitycode {cols[column][i]} for"
+                        f" unknown codeset {codeset_slug}"
+                        f" for {sourcetype} source on row {row_nr}",
+                        validation=validation,
+                    )
+                )
+
         # set tags dict for source
         source_data["tags"] = {
-            key[4:]: row_dict[key] for key in tag_keys if pd.notna(row_dict[key])
+            tag: cols[key][i] for key, tag in tag_columns if not missing[key][i]
         }
 
         # get timevar name and corresponding timevar
-        timevar_name = row_dict["timevar"]
-        if pd.notna(timevar_name):
+        timevar_name = cols["timevar"][i]
+        if not missing["timevar"][i]:
             try:
                 source_data["timevar"] = timevars[timevar_name]
             except KeyError:
@@ -440,16 +619,11 @@ def create_or_update_sources(
                         validation=validation,
                     )
                 )
-        # get all column-names starting with "subst" whith value for the current row
-        subst_keys = [
-            key
-            for key in row_dict.keys()
-            if key.startswith("subst:") and pd.notna(row_dict[key])
-        ]
         # create list of data dict for each substance emission
         emissions = {}
-        for subst_key in subst_keys:
-            subst = subst_key[6:]
+        for subst_key, subst in subst_columns:
+            if missing[subst_key][i]:
+                continue
             # dict with substance emission properties (value and substance)
             emis = {}
             emissions[subst] = emis
@@ -462,52 +636,51 @@ def create_or_update_sources(
                     import_error(f"Undefined substance {subst}", validation)
                 )
 
-            try:
-                if "emission_unit" in row_dict and not pd.isnull(
-                    row_dict["emission_unit"]
-                ):
-                    emis["value"] = emission_unit_to_si(
-                        float(row_dict[subst_key]), row_dict["emission_unit"]
-                    )
-                else:
-                    return_message.append(
-                        import_error(
-                            f"No unit specified for {sourcetype}-source"
-                            f" emissions on row {row_nr}",
-                            validation=validation,
-                        )
+            unit = cols["emission_unit"][i] if "emission_unit" in cols else None
+            if "emission_unit" not in cols or missing["emission_unit"][i]:
+                return_message.append(
+                    import_error(
+                        f"No unit specified for {sourcetype}-source"
+                        f" emissions on row {row_nr}",
+                        validation=validation,
                     )
-            except ValueError:
+                )
+            elif isinstance(emission_unit_errors.get(unit), KeyError):
                 return_message.append(
                     import_error(
-                        f"Invalid {sourcetype}-source emission value "
-                        f"{row_dict[subst_key]} on row {row_nr}",
+                        f"Missing data {emission_unit_errors[unit]} on row {row_nr}"
+                        f" for {sourcetype} sources.",
                         validation=validation,
                     )
                 )
-            except KeyError as err:
+            elif unit in emission_unit_errors or np.isnan(
+                emission_values[subst_key][i]
+            ):
                 return_message.append(
                     import_error(
-                        f"Missing data {err} on row {row_nr} for {sourcetype} sources.",
+                        f"Invalid {sourcetype}-source emission value "
+                        f"{cols[subst_key][i]} on row {row_nr}",
                         validation=validation,
                     )
                 )
+            else:
+                emis["value"] = emission_values[subst_key][i]
 
         official_facility_id, source_name = row_key
-        if pd.isna(official_facility_id):
+        if missing_facility_ids[i]:
             official_facility_id = None
 
-        if pd.isna(source_name):
+        if missing_source_names[i]:
             return_message.append(
                 import_error(
                     f"No name specified for {sourcetype} source on row {row_nr}",
                     validation=validation,
                 )
             )
-        if pd.isna(row_dict["facility_name"]):
+        if missing["facility_name"][i]:
             facility_name = None
         else:
-            facility_name = row_dict["facility_name"]
+            facility_name = cols["facility_name"][i]
 
         try:
             facility = facilities[official_facility_id]
@@ -554,29 +727,27 @@ def create_or_update_sources(
                     source = AreaSource.objects.get(
                         name=str(source_name), facility_id=facility_id
                     )
-            for key, val in source_data.items():
-                setattr(source, key, val)
+            update_source(source, source_data)
             update_sources.append(source)
-            drop_substances += list(source.substances.all())
             if sourcetype == "point":
-                create_substances += [
+                create_substances.extend(
                     PointSourceSubstance(source=source, **emis)
                     for emis in emissions.values()
-                ]
+                )
             elif sourcetype == "area":
-                create_substances += [
+                create_substances.extend(
                     AreaSourceSubstance(source=source, **emis)
                     for emis in emissions.values()
-                ]
+                )
         except (PointSource.DoesNotExist, AreaSource.DoesNotExist, KeyError):
             if sourcetype == "point":
                 source = PointSource(name=source_name, **source_data)
                 if source_key not in create_sources:
                     create_sources[source_key] = source
-                    create_substances += [
+                    create_substances.extend(
                         PointSourceSubstance(source=source, **emis)
                         for emis in emissions.values()
-                    ]
+                    )
                 else:
                     return_message.append(
                         import_error(
@@ -588,10 +759,10 @@ def create_or_update_sources(
                 source = AreaSource(name=source_name, **source_data)
                 if source_key not in create_sources:
                     create_sources[source_key] = source
-                    create_substances += [
+                    create_substances.extend(
                         AreaSourceSubstance(source=source, **emis)
                         for emis in emissions.values()
-                    ]
+                    )
                 else:
                     return_message.append(
                         import_error(
@@ -601,11 +772,12 @@ def create_or_update_sources(
                     )
         row_nr += 1
 
-    existing_facility_names = set([f.name for f in facilities.values()])
-    duplicate_facility_names = []
-    for official_id, f in create_facilities.items():
-        if f.name in existing_facility_names:
-            duplicate_facility_names.append(f.name)
+    existing_facility_names = {f.name for f in facilities.values()}
+    new_facility_names = [f.name for f in create_facilities.values()]
+    facility_name_counts = Counter(new_facility_names)
+    duplicate_facility_names = [
+        name for name in new_facility_names if name in existing_facility_names
+    ]
     if len(duplicate_facility_names) > 0:
         return_message.append(
             import_error(
@@ -615,14 +787,8 @@ def create_or_update_sources(
                 validation=validation,
             )
         )
-    duplicate_facility_names = {}
-    for f in create_facilities.values():
-        if f.name in duplicate_facility_names:
-            duplicate_facility_names[f.name] += 1
-        else:
-            duplicate_facility_names[f.name] = 1
     duplicate_facility_names = [
-        name for name, nr in duplicate_facility_names.items() if nr > 1
+        name for name, nr in facility_name_counts.items() if nr > 1
     ]
     if len(duplicate_facility_names) > 0:
         return_message.append(
@@ -633,33 +799,25 @@ def create_or_update_sources(
             )
         )
 
-    Facility.objects.bulk_create(create_facilities.values())
-    Facility.objects.bulk_update(update_facilities, ["name"])
+    Facility.objects.bulk_create(create_facilities.values(), batch_size=BATCH_SIZE)
+    Facility.objects.bulk_update(update_facilities, ["name"], batch_size=BATCH_SIZE)
 
-    facilities = cache_queryset(Facility.objects.all(), "id")
+    facility_ids = dict(Facility.objects.values_list("official_id", "id"))
     # ensure PointSource.facility_id is not None if facility exists.
-    for source in create_sources.values():
-        if source.facility is not None:
+    for (official_facility_id, _), source in create_sources.items():
+        if official_facility_id is not None:
             # find the facility_id corresponding to official id, or set None
-            source.facility_id = next(
-                (
-                    key
-                    for key, value in facilities.items()
-                    if str(value) == str(source.facility)
-                ),
-                None,
-            )
+            source.facility_id = facility_ids.get(official_facility_id)
             if source.facility_id is None:
                 raise ImportError(
                     f"Could not link pointsource {source.name} to "
                     + f"facility {source.facility.name}"
                 )
     if sourcetype == "point":
-        PointSource.objects.bulk_create(create_sources.values())
+        PointSource.objects.bulk_create(create_sources.values(), batch_size=BATCH_SIZE)
         PointSource.objects.bulk_update(
             update_sources,
             [
-                "name",
                 "geom",
                 "tags",
                 "chimney_gas_speed",
@@ -673,19 +831,19 @@ def create_or_update_sources(
                 "activitycode2",
                 "activitycode3",
             ],
+            batch_size=BATCH_SIZE,
         )
 
         # drop existing substance emissions of point-sources that will be updated
         PointSourceSubstance.objects.filter(
-            pk__in=[inst.id for inst in drop_substances]
+            source_id__in=[source.id for source in update_sources]
         ).delete()
 
         # ensure PointSourceSubstance.source_id is not None
-        for emis in create_substances:
-            emis.source_id = PointSource.objects.get(
-                name=emis.source, facility_id=emis.source.facility_id
-            ).id
-        PointSourceSubstance.objects.bulk_create(create_substances)
+        set_source_ids(PointSource, create_substances)
+        PointSourceSubstance.objects.bulk_create(
+            create_substances, batch_size=BATCH_SIZE
+        )
         return_dict = {
             "facility": {
                 "updated": len(update_facilities),
@@ -697,30 +855,29 @@ def create_or_update_sources(
             },
         }
     if sourcetype == "area":
-        AreaSource.objects.bulk_create(create_sources.values())
+        AreaSource.objects.bulk_create(create_sources.values(), batch_size=BATCH_SIZE)
         AreaSource.objects.bulk_update(
             update_sources,
             [
-                "name",
                 "geom",
                 "tags",
                 "activitycode1",
                 "activitycode2",
                 "activitycode3",
             ],
+            batch_size=BATCH_SIZE,
         )
 
         # drop existing substance emissions of point-sources that will be updated
         AreaSourceSubstance.objects.filter(
-            pk__in=[inst.id for inst in drop_substances]
+            source_id__in=[source.id for source in update_sources]
         ).delete()
 
         # ensure PointSourceSubstance.source_id is not None
-        for emis in create_substances:
-            emis.source_id = AreaSource.objects.get(
-                name=emis.source, facility_id=emis.source.facility_id
-            ).id
-        AreaSourceSubstance.objects.bulk_create(create_substances)
+        set_source_ids(AreaSource, create_substances)
+        AreaSourceSubstance.objects.bulk_create(
+            create_substances, batch_size=BATCH_SIZE
+        )
         return_dict = {
             "facility": {
                 "updated": len(update_facilities),
@@ -736,6 +893,36 @@ def create_or_update_sources(
 
 
 # @profile
+def get_source_keys(df):
+    """Return list of (official facility id, source name) for rows in sheet.
+
+    Keys are read from the index set in create_or_update_sources and coerced
+    to strings once for all rows, with missing facility ids given as None.
+    """
+    facility_ids = df.index.get_level_values(0)
+    facility_ids = facility_ids.astype(str).where(facility_ids.notna(), None)
+    source_names = df.index.get_level_values(1).astype(str)
+    return list(zip(facility_ids, source_names))
+
+
+def get_activity_rates(df, activity_keys, activities):
+    """Yield (row, activity, rate) for all specified activity rates in sheet.
+
+    Rates are read as one float array and converted to si-units [s⁻¹] column
+    by column, rates of a row are yielded together in column order.
+    """
+    rates = df[activity_keys].to_numpy(dtype=float, na_value=np.nan)
+    column_activities = [activities[key[4:]] for key in activity_keys]
+    for column, activity in enumerate(column_activities):
+        # original unit stored in activity.unit, but
+        # source activity rate stored as activity / s.
+        rates[:, column] = activity_rate_unit_to_si(rates[:, column], activity.unit)
+    rows, columns = np.nonzero(~np.isnan(rates))
+    for row, column in zip(rows, columns):
+        yield row, column_activities[column], rates[row, column]
+
+
+@transaction.atomic
 def import_sourceactivities(
     filepath,
     encoding=None,
@@ -789,7 +976,7 @@ def import_sourceactivities(
 
     if ("PointSource" in sheet_names) and ("PointSource" in import_sheets):
         log.debug("validating/importing sheet PointSource")
-        data = workbook["PointSource"].values
+        data = workbook["PointSource"].iter_rows(values_only=True)
         df_pointsource = worksheet_to_dataframe(data)
         df_pointsource = set_datatypes(df_pointsource, "point")
         # import pointsources and pointsourcesubstances
@@ -809,79 +996,60 @@ def import_sourceactivities(
         facilities = cache_queryset(Facility.objects.all(), "official_id")
         if caching_sources:
             log.debug("caching sources to speed up updates")
-            pointsourceactivities = cache_queryset(
-                PointSourceActivity.objects.select_related("activity", "source").all(),
-                ["activity", "source"],
-            )
-            pointsources = cache_sources(
-                PointSource.objects.select_related("facility").all()
-            )
+            pointsource_ids = cache_source_ids(PointSource.objects.all())
         log.debug("Reading sources")
-        create_pointsourceactivities = []
-        update_pointsourceactivities = []
+        pointsourceactivities = []
         # NB: does not work if column header starts with space, but same for subst:
-        activity_keys = [k for k in df_pointsource.columns if k.startswith("act:")]
-        row_nr = 1
-        for row_key, row in df_pointsource.iterrows():
-            # original unit stored in activity.unit, but
-            # pointsourceactivity.rate stored as activity / s.
-            if pd.isna(row.name[0]):
-                facility_id = None
-            else:
-                facility_id = str(row.name[0])
-            if caching_sources:
-                # row index set as ["facility_id", "source_name"]
-                # in create_or_update_source
-                pointsource = pointsources[facility_id, str(row.name[1])]
-            else:
-                facility = facilities[facility_id] if facility_id is not None else None
-                pointsource = PointSource.objects.get(
-                    name=str(row.name[1]), facility=facility
+        activity_keys, msgs = get_active_activity_keys(
+            df_pointsource, activities, validation=validation
+        )
+        return_message += msgs
+        source_keys = get_source_keys(df_pointsource)
+        source_row = None
+        for row, activity, rate in get_activity_rates(
+            df_pointsource, activity_keys, activities
+        ):
+            if row != source_row:
+                source_row = row
+                facility_id, source_name = source_keys[row]
+                if caching_sources:
+                    pointsource_id = pointsource_ids.get((facility_id, source_name))
+                else:
+                    facility = (
+                        facilities[facility_id] if facility_id is not None else None
+                    )
+                    pointsource_id = (
+                        PointSource.objects.filter(name=source_name, facility=facility)
+                        .values_list("id", flat=True)
+                        .first()
+                    )
+                log.debug(f"pointsource {row + 1}: {source_name}")
+            if pointsource_id is None:
+                # source not created due to errors already reported in validation
+                continue
+            pointsourceactivities.append(
+                PointSourceActivity(
+                    activity_id=activity.id, source_id=pointsource_id, rate=rate
                 )
-            log.debug(f"pointsource {row_nr}: {pointsource.name}")
-            for activity_key in activity_keys:
-                if not pd.isnull(row[activity_key]):
-                    rate = row[activity_key]
-                    activity_name = activity_key[4:]
-                    try:
-                        activity = activities[activity_name]
-                    except KeyError:
-                        return_message += import_error(
-                            f"unknown activity '{activity_name}'"
-                            + f" for pointsource '{row['source_name']}'",
-                            validation=validation,
-                        )
-                    rate = activity_rate_unit_to_si(rate, activity.unit)
-                    try:
-                        if caching_sources:
-                            psa = pointsourceactivities[activity, pointsource]
-                        else:
-                            psa = PointSourceActivity.objects.get(
-                                activity_id=activity.id, source_id=pointsource.id
-                            )
-                        setattr(psa, "rate", rate)
-                        update_pointsourceactivities.append(psa)
-                    except (PointSourceActivity.DoesNotExist, KeyError):
-                        psa = PointSourceActivity(
-                            activity=activity, source=pointsource, rate=rate
-                        )
-                        create_pointsourceactivities.append(psa)
-            row_nr += 1
-        log.debug("Creating point-sources")
-        PointSourceActivity.objects.bulk_create(create_pointsourceactivities)
-        PointSourceActivity.objects.bulk_update(
-            update_pointsourceactivities, ["activity", "source", "rate"]
+            )
+        log.debug("Creating point-source activities")
+        # existing activities of sources are updated in the same statement
+        nr_created, nr_updated = bulk_upsert(
+            PointSourceActivity,
+            pointsourceactivities,
+            unique_fields=["source", "activity"],
+            update_fields=["rate"],
         )
         return_dict.update(
             {
                 "pointsourceactivity": {
-                    "updated": len(update_pointsourceactivities),
-                    "created": len(create_pointsourceactivities),
+                    "updated": nr_updated,
+                    "created": nr_created,
                 }
             }
         )
     if ("AreaSource" in sheet_names) and ("AreaSource" in import_sheets):
-        data = workbook["AreaSource"].values
+        data = workbook["AreaSource"].iter_rows(values_only=True)
         df_areasource = worksheet_to_dataframe(data)
         df_areasource = set_datatypes(df_areasource, "area")
         ps, msgs = create_or_update_sources(
@@ -894,61 +1062,37 @@ def import_sourceactivities(
         return_message += msgs
         # for now always caching areasources, change if case with many areasources
         # becomes relevant.
-        areasourceactivities = cache_queryset(
-            AreaSourceActivity.objects.select_related("activity", "source").all(),
-            ["activity", "source"],
-        )
         activities = cache_queryset(Activity.objects.all(), "name")
-        areasources = cache_sources(
-            AreaSource.objects.select_related("facility")
-            .prefetch_related("substances")
-            .all()
+        areasource_ids = cache_source_ids(AreaSource.objects.all())
+        areasourceactivities = []
+        # NB: does not work if column header starts with space, but same for subst:
+        activity_keys, msgs = get_active_activity_keys(
+            df_areasource, activities, validation=validation
         )
-        create_areasourceactivities = []
-        update_areasourceactivities = []
-        for row_key, row in df_areasource.iterrows():
-            # NB: does not work if column header starts with space, but same for subst:
-            activity_keys = [k for k in row.keys() if k.startswith("act:")]
-            for activity_key in activity_keys:
-                if not pd.isna(row[activity_key]):
-                    rate = float(row[activity_key])
-                    try:
-                        activity = activities[activity_key[4:]]
-                    except KeyError:
-                        return_message += import_error(
-                            f"unknown activity '{activity_name}'"
-                            f" for areasource '{row['source_name']}'",
-                            validation=validation,
-                        )
-
-                    rate = activity_rate_unit_to_si(rate, activity.unit)
-                    # original unit stored in activity.unit, but
-                    # areasourceactivity.rate stored as activity / s.
-                    # facility_id and source_name set as df index
-                    if pd.isna(row.name[0]):
-                        facility_id = None
-                    else:
-                        facility_id = str(row.name[0])
-                    areasource = areasources[facility_id, str(row.name[1])]
-                    try:
-                        psa = areasourceactivities[activity, areasource]
-                        setattr(psa, "rate", rate)
-                        update_areasourceactivities.append(psa)
-                    except KeyError:
-                        psa = AreaSourceActivity(
-                            activity=activity, source=areasource, rate=rate
-                        )
-                        create_areasourceactivities.append(psa)
+        return_message += msgs
+        source_keys = get_source_keys(df_areasource)
+        for row, activity, rate in get_activity_rates(
+            df_areasource, activity_keys, activities
+        ):
+            areasource_id = areasource_ids[source_keys[row]]
+            areasourceactivities.append(
+                AreaSourceActivity(
+                    activity_id=activity.id, source_id=areasource_id, rate=rate
+                )
+            )
 
-        AreaSourceActivity.objects.bulk_create(create_areasourceactivities)
-        AreaSourceActivity.objects.bulk_update(
-            update_areasourceactivities, ["activity", "source", "rate"]
+        # existing activities of sources are updated in the same statement
+        nr_created, nr_updated = bulk_upsert(
+            AreaSourceActivity,
+            areasourceactivities,
+            unique_fields=["source", "activity"],
+            update_fields=["rate"],
         )
         return_dict.update(
             {
                 "areasourceactivity": {
-                    "updated": len(update_areasourceactivities),
-                    "created": len(create_areasourceactivities),
+                    "updated": nr_updated,
+                    "created": nr_created,
                 }
             }
         )
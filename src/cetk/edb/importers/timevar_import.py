@@ -1,3 +1,5 @@
+import ast
+
 import numpy as np
 from django.db import IntegrityError
 
@@ -8,7 +10,7 @@ from .utils import import_error, worksheet_to_dataframe
 
 def import_timevarsheet(workbook, validation=False, sheetname="Timevar"):
     return_message = []
-    timevar_data = workbook[sheetname].values
+    timevar_data = workbook[sheetname].iter_rows(values_only=True)
     df_timevar = worksheet_to_dataframe(timevar_data)
     if sheetname == "Timevar":
         keyname = "emission"
@@ -19,28 +21,20 @@ def import_timevarsheet(workbook, validation=False, sheetname="Timevar"):
     timevar_dict = {keyname: {}}
 
     # NB this only works if Excel file has exact same format
+    # each profile is a block of 27 rows, with the label on the first row,
+    # 24 rows of hourly values for each weekday and the month values on row 26
     nr_timevars = (len(df_timevar["ID"]) + 1) // 27
-    for i in range(nr_timevars):
-        label = df_timevar["ID"][i * 27]
-        typeday = np.asarray(
-            df_timevar[
-                [
-                    "monday",
-                    "tuesday",
-                    "wednesday",
-                    "thursday",
-                    "friday",
-                    "saturday",
-                    "sunday",
-                ]
-            ][i * 27 : i * 27 + 24]
-        )
-        month = np.asarray(df_timevar.iloc[i * 27 + 25, 2:14])
-        typeday_str = np.array2string(typeday).replace("\n", "").replace(" ", ", ")
-        month_str = np.array2string(month).replace("\n", "").replace(" ", ", ")
-        timevar_dict[keyname].update(
-            {label: {"typeday": typeday_str, "month": month_str}}
-        )
+    block_starts = 27 * np.arange(nr_timevars)
+    labels = df_timevar["ID"].to_numpy()[block_starts]
+    typedays = df_timevar[
+        ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+    ].to_numpy()[block_starts[:, np.newaxis] + np.arange(24)]
+    months = df_timevar.iloc[:, 2:14].to_numpy()[block_starts + 25]
+    for label, typeday, month in zip(labels, typedays, months):
+        timevar_dict[keyname][label] = {
+            "typeday": typeday.tolist(),
+            "month": month.tolist(),
+        }
     tv, return_append = import_timevars(
         timevar_dict, overwrite=True, validation=validation
     )
@@ -60,10 +54,11 @@ def import_timevars(timevar_data, overwrite=False, validation=False):
             try:
                 typeday = timevar_data["typeday"]
                 month = timevar_data["month"]
-                if type(typeday) == list:
-                    typeday = str(typeday)
-                if type(month) == list:
-                    month = str(month)
+                # profiles may also be given as list literals
+                if isinstance(typeday, str):
+                    typeday = ast.literal_eval(typeday)
+                if isinstance(month, str):
+                    month = ast.literal_eval(month)
                 if overwrite:
                     newobj, _ = timevarclass.objects.update_or_create(
                         name=name,
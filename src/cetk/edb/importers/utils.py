@@ -1,7 +1,16 @@
 import pandas as pd
 
 from cetk.edb.cache import cache_queryset
-from cetk.edb.models import Settings
+from cetk.edb.const import BATCH_SIZE
+from cetk.edb.models import ActivityCode, CodeSet, Settings
+
+try:
+    from python_calamine import CalamineWorkbook
+except ImportError:
+    CalamineWorkbook = None
+
+# spreadsheets larger than this [bytes] are read using python-calamine if available
+CALAMINE_MIN_FILE_SIZE = 1_000_000
 
 
 class ValidationError(Exception):
@@ -16,6 +25,34 @@ class EmptySheet(Exception):
     pass
 
 
+def bulk_upsert(model, instances, unique_fields, update_fields):
+    """Insert instances, updating records that exist with the same unique fields.
+
+    Returns the number of created and updated records. Existing records are
+    counted by reading the unique fields of records sharing the first unique
+    field value with any of the instances, not by counting the whole table.
+    """
+    attnames = [model._meta.get_field(name).attname for name in unique_fields]
+    keys = {
+        tuple(getattr(instance, name) for name in attnames) for instance in instances
+    }
+    first_values = list({key[0] for key in keys})
+    nr_updated = 0
+    for start in range(0, len(first_values), BATCH_SIZE):
+        existing = model.objects.filter(
+            **{f"{attnames[0]}__in": first_values[start : start + BATCH_SIZE]}
+        ).values_list(*attnames)
+        nr_updated += sum(1 for key in existing if key in keys)
+    model.objects.bulk_create(
+        instances,
+        batch_size=BATCH_SIZE,
+        update_conflicts=True,
+        unique_fields=unique_fields,
+        update_fields=update_fields,
+    )
+    return len(keys) - nr_updated, nr_updated
+
+
 def nan2None(d):
     out = d.copy()
     for k, val in out.items():
@@ -23,13 +60,19 @@ def nan2None(d):
     return out
 
 
-def import_error(message, return_message="", validation=False):
-    """import error management"""
+def import_error(message, validation=False, sink=None):
+    """import error management
+
+    Raises ValidationError unless validating, then the message is returned,
+    or appended to sink if a list of messages is given.
+    """
     if not validation:
         raise ValidationError(f"VALIDATION: {message}")
-    else:
-        return_message += f"VALIDATION: {message}\n"
-    return return_message
+    message = f"VALIDATION: {message}\n"
+    if sink is not None:
+        sink.append(message)
+        return sink
+    return message
 
 
 def import_row_error(msg, row_nr, validation=False):
@@ -51,35 +94,82 @@ def cache_codeset(code_set):
     return cache_queryset(code_set.codes.all(), "code")
 
 
+def cache_activitycodes(code_set_ids):
+    """return dict {code_set_id: {code: activitycode}}, read in a single query."""
+    codes = {code_set_id: {} for code_set_id in code_set_ids}
+    for activitycode in ActivityCode.objects.filter(code_set_id__in=code_set_ids):
+        codes[activitycode.code_set_id][activitycode.code] = activitycode
+    return codes
+
+
 def cache_codesets():
     """
     return list of dictionaries with activity-codes
     for all code-sets in Settings.
     """
     settings = Settings.get_current()
-    code_sets = {}
-    if settings.codeset1 is not None:
-        code_sets[settings.codeset1.slug] = cache_codeset(settings.codeset1)
-    if settings.codeset2 is not None:
-        code_sets[settings.codeset2.slug] = cache_codeset(settings.codeset2)
-    if settings.codeset3 is not None:
-        code_sets[settings.codeset3.slug] = cache_codeset(settings.codeset3)
-    return code_sets
+    code_set_ids = [
+        code_set_id
+        for code_set_id in (
+            settings.codeset1_id,
+            settings.codeset2_id,
+            settings.codeset3_id,
+        )
+        if code_set_id is not None
+    ]
+    code_sets = CodeSet.objects.in_bulk(code_set_ids)
+    codes = cache_activitycodes(code_set_ids)
+    return {
+        code_sets[code_set_id].slug: codes[code_set_id] for code_set_id in code_set_ids
+    }
+
+
+def use_calamine(filepath):
+    """Return True if spreadsheet should be read using python-calamine."""
+    return (
+        CalamineWorkbook is not None
+        and filepath.stat().st_size > CALAMINE_MIN_FILE_SIZE
+    )
+
+
+def calamine_cell_value(value):
+    """Return cell value as given by openpyxl for a python-calamine value."""
+    # python-calamine gives empty cells as '' and all numbers as float
+    if value == "":
+        return None
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+def calamine_sheet_values(filepath, sheetname):
+    """Return cell values of sheet, row by row, read using python-calamine.
+    If the workbook has a single sheet, it is read irrespective of its name.
+    """
+    # all rows are read before the workbook is closed
+    with CalamineWorkbook.from_path(str(filepath)) as workbook:
+        if len(workbook.sheet_names) == 1:
+            sheetname = workbook.sheet_names[0]
+        rows = workbook.get_sheet_by_name(sheetname).to_python()
+    for row in rows:
+        yield tuple(calamine_cell_value(value) for value in row)
 
 
 def worksheet_to_dataframe(data):
-    data = list(data)
-    if not data:
+    rows = iter(data)
+    try:
+        # first row is used as header
+        header = next(rows)
+    except StopIteration:
         raise EmptySheet("Sheet is empty")
-    df = pd.DataFrame(data)
-    # Set the first row as the header
-    df.columns = df.iloc[0]
-    df = df[1:].reset_index(drop=True)
-    # Remove completely empty rows
-    df = df.dropna(how="all")
-    # Remove completely empty columns without a header
-    df = df.loc[:, ~(df.isna().all() & df.columns.isna())]
-    return df
+    # rows are consumed once into the dataframe, without an intermediate copy
+    df = pd.DataFrame(list(rows), columns=header, dtype=object)
+    # one null mask is used to remove completely empty rows
+    # and completely empty columns without a header
+    isna = df.isna().to_numpy()
+    empty_rows = isna.all(axis=1)
+    empty_columns = isna.all(axis=0) & df.columns.isna()
+    return df.loc[~empty_rows, ~empty_columns]
 
 
 def get_substance_emission_columns(df):
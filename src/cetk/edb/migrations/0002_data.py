@@ -119,17 +119,28 @@ def create_parameters(apps, schema_editor):
     Substance = apps.get_model("edb", "Substance")
     Parameter = apps.get_model("edb", "Parameter")
 
-    # create substances and related parameters
-    for slug, name, long_name in SUBSTANCES:
-        substance = Substance.objects.create(slug=slug, name=name, long_name=long_name)
-
+    # all records are inserted in bulk, instead of one statement per record
+    Substance.objects.bulk_create(
+        [
+            Substance(slug=slug, name=name, long_name=long_name)
+            for slug, name, long_name in SUBSTANCES
+        ]
+    )
+    # primary keys are only set by bulk_create on recent SQLite versions
+    substances = Substance.objects.order_by("pk")
+
+    # create related parameters
+    parameters = []
+    for substance in substances:
         # traffic work is created as 'traffic' parameter instead of 'emission'
-        if slug == "traffic_work":
-            Parameter.objects.create(
-                quantity="traffic",
-                slug="traffic_work",
-                name="Traffic work",
-                substance=substance,
+        if substance.slug == "traffic_work":
+            parameters.append(
+                Parameter(
+                    quantity="traffic",
+                    slug="traffic_work",
+                    name="Traffic work",
+                    substance=substance,
+                )
             )
             continue
 
@@ -138,16 +149,19 @@ def create_parameters(apps, schema_editor):
         emis = Parameter(quantity="emission", substance=substance)
         auto_name_parameter(emis)
         auto_slug_parameter(emis)
-        emis.save()
+        parameters.append(emis)
 
         conc = Parameter(quantity="concentration", substance=substance)
         auto_name_parameter(conc)
         auto_slug_parameter(conc)
-        conc.save()
+        parameters.append(conc)
 
     # create generic parameters
-    for quantity, slug, name in PARAMETERS:
-        Parameter.objects.create(quantity=quantity, name=name, slug=slug)
+    parameters += [
+        Parameter(quantity=quantity, name=name, slug=slug)
+        for quantity, slug, name in PARAMETERS
+    ]
+    Parameter.objects.bulk_create(parameters)
 
 
 class Migration(migrations.Migration):
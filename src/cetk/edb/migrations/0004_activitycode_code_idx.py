@@ -0,0 +1,21 @@
+# Generated by Django 4.2.2 on 2026-10-17 09:12
+
+import django.db.models.functions.comparison
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("edb", "0003_create_gpkg_tables"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="activitycode",
+            index=models.Index(
+                models.F("code_set"),
+                django.db.models.functions.comparison.Collate("code", "nocase"),
+                name="activitycode_code_idx",
+            ),
+        ),
+    ]
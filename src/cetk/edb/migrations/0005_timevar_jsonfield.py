@@ -0,0 +1,88 @@
+# Generated by Django 4.2.2 on 2026-10-17 10:41
+
+import ast
+import json
+
+from django.db import migrations, models
+from django.db.models import Func, Q
+
+import cetk.edb.models.timevar_models
+from cetk.edb.const import BATCH_SIZE
+
+
+def json_valid(field_name):
+    return Func(field_name, function="JSON_VALID", output_field=models.BooleanField())
+
+
+def profiles_to_json(apps, schema_editor):
+    """Rewrite timevar profiles stored as Python literals to JSON."""
+    for model_name in ("timevar", "flowtimevar", "coldstarttimevar"):
+        Timevar = apps.get_model("edb", model_name)
+        timevars = Timevar.objects.alias(
+            typeday_valid=json_valid("typeday"), month_valid=json_valid("month")
+        ).filter(Q(typeday_valid=False) | Q(month_valid=False))
+        if not timevars.exists():
+            continue
+        batch = []
+        for timevar in timevars.only("typeday", "month").iterator(
+            chunk_size=BATCH_SIZE
+        ):
+            timevar.typeday = json.dumps(ast.literal_eval(timevar.typeday))
+            timevar.month = json.dumps(ast.literal_eval(timevar.month))
+            batch.append(timevar)
+            if len(batch) == BATCH_SIZE:
+                Timevar.objects.bulk_update(batch, ["typeday", "month"])
+                batch = []
+        Timevar.objects.bulk_update(batch, ["typeday", "month"])
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("edb", "0004_activitycode_code_idx"),
+    ]
+
+    operations = [
+        migrations.RunPython(profiles_to_json, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name="coldstarttimevar",
+            name="month",
+            field=models.JSONField(
+                default=cetk.edb.models.timevar_models.default_timevar_month
+            ),
+        ),
+        migrations.AlterField(
+            model_name="coldstarttimevar",
+            name="typeday",
+            field=models.JSONField(
+                default=cetk.edb.models.timevar_models.default_timevar_typeday
+            ),
+        ),
+        migrations.AlterField(
+            model_name="flowtimevar",
+            name="month",
+            field=models.JSONField(
+                default=cetk.edb.models.timevar_models.default_timevar_month
+            ),
+        ),
+        migrations.AlterField(
+            model_name="flowtimevar",
+            name="typeday",
+            field=models.JSONField(
+                default=cetk.edb.models.timevar_models.default_timevar_typeday
+            ),
+        ),
+        migrations.AlterField(
+            model_name="timevar",
+            name="month",
+            field=models.JSONField(
+                default=cetk.edb.models.timevar_models.default_timevar_month
+            ),
+        ),
+        migrations.AlterField(
+            model_name="timevar",
+            name="typeday",
+            field=models.JSONField(
+                default=cetk.edb.models.timevar_models.default_timevar_typeday
+            ),
+        ),
+    ]
@@ -0,0 +1,84 @@
+# Generated by Django 4.2.2 on 2026-10-17 11:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("edb", "0005_timevar_jsonfield"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="areasource",
+            index=models.Index(
+                condition=models.Q(("activitycode2__isnull", False)),
+                fields=["activitycode2"],
+                name="areasource_activitycode2_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="areasource",
+            index=models.Index(
+                condition=models.Q(("activitycode3__isnull", False)),
+                fields=["activitycode3"],
+                name="areasource_activitycode3_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="areasource",
+            index=models.Index(
+                condition=models.Q(("timevar__isnull", False)),
+                fields=["timevar"],
+                name="areasource_timevar_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="gridsource",
+            index=models.Index(
+                condition=models.Q(("activitycode2__isnull", False)),
+                fields=["activitycode2"],
+                name="gridsource_activitycode2_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="gridsource",
+            index=models.Index(
+                condition=models.Q(("activitycode3__isnull", False)),
+                fields=["activitycode3"],
+                name="gridsource_activitycode3_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="gridsource",
+            index=models.Index(
+                condition=models.Q(("timevar__isnull", False)),
+                fields=["timevar"],
+                name="gridsource_timevar_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="pointsource",
+            index=models.Index(
+                condition=models.Q(("activitycode2__isnull", False)),
+                fields=["activitycode2"],
+                name="pointsource_activitycode2_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="pointsource",
+            index=models.Index(
+                condition=models.Q(("activitycode3__isnull", False)),
+                fields=["activitycode3"],
+                name="pointsource_activitycode3_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="pointsource",
+            index=models.Index(
+                condition=models.Q(("timevar__isnull", False)),
+                fields=["timevar"],
+                name="pointsource_timevar_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 4.2.2 on 2026-10-17 12:05
+
+import ast
+import json
+
+from django.db import migrations, models
+from django.db.models import Func
+
+import cetk.edb.models.source_models
+from cetk.edb.const import BATCH_SIZE
+
+
+def weights_to_json(apps, schema_editor):
+    """Rewrite vertical distribution weights stored as Python literals to JSON."""
+    VerticalDist = apps.get_model("edb", "verticaldist")
+    vdists = list(
+        VerticalDist.objects.alias(
+            weights_valid=Func(
+                "weights", function="JSON_VALID", output_field=models.BooleanField()
+            )
+        )
+        .filter(weights_valid=False)
+        .only("weights")
+    )
+    for vdist in vdists:
+        vdist.weights = json.dumps(ast.literal_eval(vdist.weights))
+    VerticalDist.objects.bulk_update(vdists, ["weights"], batch_size=BATCH_SIZE)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("edb", "0006_source_partial_indexes"),
+    ]
+
+    operations = [
+        migrations.RunPython(weights_to_json, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name="verticaldist",
+            name="weights",
+            field=models.JSONField(
+                default=cetk.edb.models.source_models.default_vertical_dist
+            ),
+        ),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 4.2.2 on 2026-10-17 13:20
+
+import ast
+import json
+
+from django.db import migrations, models
+from django.db.models import Func
+
+import cetk.edb.models.road_models
+from cetk.edb.const import BATCH_SIZE
+
+
+def traffic_conditions_to_json(apps, schema_editor):
+    """Rewrite traffic conditions stored as Python literals to JSON."""
+    CongestionProfile = apps.get_model("edb", "congestionprofile")
+    profiles = list(
+        CongestionProfile.objects.alias(
+            traffic_condition_valid=Func(
+                "traffic_condition",
+                function="JSON_VALID",
+                output_field=models.BooleanField(),
+            )
+        )
+        .filter(traffic_condition_valid=False)
+        .only("traffic_condition")
+    )
+    for profile in profiles:
+        profile.traffic_condition = json.dumps(
+            ast.literal_eval(profile.traffic_condition)
+        )
+    CongestionProfile.objects.bulk_update(
+        profiles, ["traffic_condition"], batch_size=BATCH_SIZE
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("edb", "0007_verticaldist_jsonfield"),
+    ]
+
+    operations = [
+        migrations.RunPython(traffic_conditions_to_json, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name="congestionprofile",
+            name="traffic_condition",
+            field=models.JSONField(
+                default=cetk.edb.models.road_models.default_congestion_profile_data
+            ),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 4.2.2 on 2026-10-17 13:45
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("edb", "0008_congestionprofile_jsonfield"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="vehicleef",
+            name="traffic_situation",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.PROTECT,
+                to="edb.trafficsituation",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="vehicleef",
+            name="vehicle",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.PROTECT,
+                to="edb.vehicle",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="vehicleef",
+            index=models.Index(
+                fields=["traffic_situation", "substance"],
+                name="vehicleef_ts_substance_idx",
+            ),
+        ),
+    ]
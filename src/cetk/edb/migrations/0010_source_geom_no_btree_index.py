@@ -0,0 +1,40 @@
+# Generated by Django 4.2.2 on 2026-10-17 14:02
+
+import django.contrib.gis.db.models.fields
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("edb", "0009_vehicleef_ts_substance_idx"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="pointsource",
+            name="geom",
+            field=django.contrib.gis.db.models.fields.PointField(
+                geography=True,
+                srid=4326,
+                verbose_name="the position of the point-source",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="areasource",
+            name="geom",
+            field=django.contrib.gis.db.models.fields.PolygonField(
+                geography=True,
+                srid=4326,
+                verbose_name="the extent of the area source",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="roadsource",
+            name="geom",
+            field=django.contrib.gis.db.models.fields.LineStringField(
+                geography=True,
+                srid=4326,
+                verbose_name="the road coordinates",
+            ),
+        ),
+    ]
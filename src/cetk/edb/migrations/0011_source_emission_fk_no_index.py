@@ -0,0 +1,71 @@
+# Generated by Django 4.2.2 on 2026-10-17 14:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("edb", "0010_source_geom_no_btree_index"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="pointsourcesubstance",
+            name="source",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                to="edb.pointsource",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="pointsourceactivity",
+            name="source",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                to="edb.pointsource",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="areasourcesubstance",
+            name="source",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                to="edb.areasource",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="areasourceactivity",
+            name="source",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                to="edb.areasource",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="gridsourcesubstance",
+            name="source",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                to="edb.gridsource",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="gridsourceactivity",
+            name="source",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                to="edb.gridsource",
+            ),
+        ),
+        migrations.RemoveIndex(
+            model_name="vehiclefuelcomb",
+            name="edb_vehicle_vehicle_603f1f_idx",
+        ),
+    ]
@@ -0,0 +1,179 @@
+# Generated by Django 4.2.2 on 2026-10-17 14:08
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("edb", "0011_source_emission_fk_no_index"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="pointsource",
+            name="facility",
+            field=models.ForeignKey(
+                blank=True,
+                db_index=False,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                to="edb.facility",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="pointsource",
+            name="activitycode1",
+            field=models.ForeignKey(
+                blank=True,
+                db_index=False,
+                null=True,
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="+",
+                to="edb.activitycode",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="pointsource",
+            name="activitycode2",
+            field=models.ForeignKey(
+                blank=True,
+                db_index=False,
+                null=True,
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="+",
+                to="edb.activitycode",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="pointsource",
+            name="activitycode3",
+            field=models.ForeignKey(
+                blank=True,
+                db_index=False,
+                null=True,
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="+",
+                to="edb.activitycode",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="pointsource",
+            name="timevar",
+            field=models.ForeignKey(
+                blank=True,
+                db_index=False,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="+",
+                to="edb.timevar",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="areasource",
+            name="facility",
+            field=models.ForeignKey(
+                blank=True,
+                db_index=False,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                to="edb.facility",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="areasource",
+            name="activitycode1",
+            field=models.ForeignKey(
+                blank=True,
+                db_index=False,
+                null=True,
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="+",
+                to="edb.activitycode",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="areasource",
+            name="activitycode2",
+            field=models.ForeignKey(
+                blank=True,
+                db_index=False,
+                null=True,
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="+",
+                to="edb.activitycode",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="areasource",
+            name="activitycode3",
+            field=models.ForeignKey(
+                blank=True,
+                db_index=False,
+                null=True,
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="+",
+                to="edb.activitycode",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="areasource",
+            name="timevar",
+            field=models.ForeignKey(
+                blank=True,
+                db_index=False,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="+",
+                to="edb.timevar",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="gridsource",
+            name="activitycode1",
+            field=models.ForeignKey(
+                blank=True,
+                db_index=False,
+                null=True,
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="+",
+                to="edb.activitycode",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="gridsource",
+            name="activitycode2",
+            field=models.ForeignKey(
+                blank=True,
+                db_index=False,
+                null=True,
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="+",
+                to="edb.activitycode",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="gridsource",
+            name="activitycode3",
+            field=models.ForeignKey(
+                blank=True,
+                db_index=False,
+                null=True,
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="+",
+                to="edb.activitycode",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="gridsource",
+            name="timevar",
+            field=models.ForeignKey(
+                blank=True,
+                db_index=False,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="+",
+                to="edb.timevar",
+            ),
+        ),
+    ]
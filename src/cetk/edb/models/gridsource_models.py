@@ -33,7 +33,7 @@ class GridSource(PointAreaGridSourceBase):
 class GridSourceActivity(SourceActivity):
     """An emitting activity for a grid-source."""
 
-    source = models.ForeignKey("GridSource", on_delete=models.CASCADE)
+    source = models.ForeignKey("GridSource", on_delete=models.CASCADE, db_index=False)
     raster = models.CharField(
         verbose_name="distribution raster", max_length=CHAR_FIELD_LENGTH
     )
@@ -42,7 +42,7 @@ class GridSourceActivity(SourceActivity):
 class GridSourceSubstance(SourceSubstance):
     """A substance emission of a grid-source ."""
 
-    source = models.ForeignKey("GridSource", on_delete=models.CASCADE)
+    source = models.ForeignKey("GridSource", on_delete=models.CASCADE, db_index=False)
     raster = models.CharField(
         verbose_name="distribution raster", max_length=CHAR_FIELD_LENGTH
     )
@@ -1,6 +1,7 @@
 """Database models related to road-traffic."""
 
-import ast
+from collections import defaultdict
+from functools import cached_property
 from itertools import groupby
 
 import numpy as np
@@ -10,7 +11,7 @@ from django.contrib.gis.geos import Point
 from django.db.models import F, Q
 from django.utils.translation import gettext_lazy as _
 
-from cetk.edb.const import CHAR_FIELD_LENGTH, CODE_FIELD_LENGTH, WGS84_SRID
+from cetk.edb.const import BATCH_SIZE, CHAR_FIELD_LENGTH, CODE_FIELD_LENGTH, WGS84_SRID
 
 from .common_models import Settings, Substance
 from .source_models import SourceBase
@@ -27,7 +28,7 @@ class RoadClassValidationError(Exception):
 
 
 def default_congestion_profile_data():
-    return str(24 * [7 * [1]])
+    return 24 * [7 * [1]]
 
 
 class CongestionProfile(models.Model):
@@ -48,10 +49,7 @@ class CongestionProfile(models.Model):
     # typical conditions given for a typeweek
     # hours are rows and days are columns
 
-    traffic_condition = models.CharField(
-        max_length=CODE_FIELD_LENGTH,
-        default=default_congestion_profile_data,
-    )
+    traffic_condition = models.JSONField(default=default_congestion_profile_data)
 
     class Meta:
         default_related_name = "congestion_profiles"
@@ -63,20 +61,39 @@ class CongestionProfile(models.Model):
         """Return the fraction of each condition.
         args:
            timevar: time-variation to estimate fractions for
-        """
 
-        cond = np.array(ast.literal_eval(self.traffic_condition))
-        flow = np.array(ast.literal_eval(timevar.typeday))
+        Fractions are cached on the instance by traffic condition and typeday,
+        so they are recalculated when either profile is changed.
+        """
+        key = (
+            tuple(map(tuple, self.traffic_condition)),
+            tuple(map(tuple, timevar.typeday)),
+        )
+        if key in self._fractions:
+            return self._fractions[key]
+        cond = self.traffic_condition_array
+        flow = np.array(timevar.typeday)
         flow_sum = flow.sum()
-        return {
+        fractions = {
             los.name.lower(): np.where(cond == los, flow, 0).sum() / flow_sum
             for los in self.LevelOfService
         }
+        self._fractions[key] = fractions
+        return fractions
+
+    @cached_property
+    def _fractions(self):
+        return {}
+
+    @property
+    def traffic_condition_array(self):
+        """Return traffic condition as an array (hours x weekdays)."""
+        return np.asarray(self.traffic_condition)
 
     def to_series(self, time_index, timezone=None):
         if timezone is None:
             timezone = Settings.get_current().timezone
-        traffic_condition = np.array(ast.literal_eval(self.traffic_condition))
+        traffic_condition = self.traffic_condition_array
         local_time_index = time_index.tz_convert(timezone)
         return pd.Series(
             traffic_condition[local_time_index.hour, local_time_index.weekday],
@@ -104,9 +121,11 @@ class VehicleEF(models.Model):
     saturated = models.FloatField(default=0)
     stopngo = models.FloatField(default=0)
     coldstart = models.FloatField(default=0)
-    traffic_situation = models.ForeignKey(TrafficSituation, on_delete=models.PROTECT)
+    traffic_situation = models.ForeignKey(
+        TrafficSituation, on_delete=models.PROTECT, db_index=False
+    )
     substance = models.ForeignKey(Substance, on_delete=models.PROTECT, related_name="+")
-    vehicle = models.ForeignKey("Vehicle", on_delete=models.PROTECT)
+    vehicle = models.ForeignKey("Vehicle", on_delete=models.PROTECT, db_index=False)
     fuel = models.ForeignKey("VehicleFuel", on_delete=models.PROTECT, related_name="+")
 
     class Meta:
@@ -116,6 +135,13 @@ class VehicleEF(models.Model):
                 name="vehicleef_unique_in_efset",
             ),
         ]
+        # emission factors are read by traffic situation (and substance)
+        indexes = [
+            models.Index(
+                fields=("traffic_situation", "substance"),
+                name="vehicleef_ts_substance_idx",
+            ),
+        ]
         default_related_name = "emissionfactors"
         verbose_name_plural = "Vehicle emission factors"
 
@@ -188,9 +214,6 @@ class VehicleFuelComb(models.Model):
             ),
         ]
         default_related_name = "vehiclefuelcombs"
-        indexes = [
-            models.Index(fields=("vehicle", "fuel")),
-        ]
 
 
 class RoadSource(SourceBase):
@@ -211,7 +234,7 @@ class RoadSource(SourceBase):
     )
     heavy_vehicle_share = models.FloatField(null=True, blank=True)
     geom = models.LineStringField(
-        "the road coordinates", srid=WGS84_SRID, geography=True, db_index=True
+        "the road coordinates", srid=WGS84_SRID, geography=True
     )
     roadclass = models.ForeignKey(
         "RoadClass", on_delete=models.PROTECT, related_name="+"
@@ -326,17 +349,72 @@ class RoadSource(SourceBase):
             ac3: a list of activitycode instances
         """
 
-        vehicle_fuel_combs = {}
-        for rec in VehicleFuelComb.objects.all():
-            vehicle_fuel_combs[(rec.vehicle_id, rec.fuel_id)] = (
-                rec.activitycode1,
-                rec.activitycode2,
-                rec.activitycode3,
+        # emissions are only calculated for valid vehicle fuel combinations
+        # with activity codes matching the code filters
+        ac_filters = (ac1, ac2, ac3)
+        vehicle_fuel_combs = {
+            (rec.vehicle_id, rec.fuel_id)
+            for rec in VehicleFuelComb.objects.select_related(
+                "activitycode1", "activitycode2", "activitycode3"
+            )
+            if all(
+                ac_filter is None or (ac is not None and ac.matches(ac_filter))
+                for ac, ac_filter in zip(
+                    (rec.activitycode1, rec.activitycode2, rec.activitycode3),
+                    ac_filters,
+                )
             )
+        }
+        efs_by_veh_and_fuel = {}
+        efs = (
+            VehicleEF.objects.filter(
+                traffic_situation_id=self.roadclass.traffic_situation_id
+            )
+            .select_related("substance")
+            .only(
+                "coldstart",
+                "freeflow",
+                "heavy",
+                "saturated",
+                "stopngo",
+                "substance",
+                "vehicle",
+                "fuel",
+            )
+        )
+        if substance is not None:
+            efs = efs.filter(substance=substance)
+        for ef in efs.iterator(chunk_size=BATCH_SIZE):
+            efs_by_veh_and_fuel.setdefault((ef.vehicle_id, ef.fuel_id), []).append(ef)
+        # substances and factors for coldstart and each level of service
+        ef_coeffs = {
+            key: (
+                [ef.substance for ef in efs],
+                np.array(
+                    [
+                        (ef.coldstart, ef.freeflow, ef.heavy, ef.saturated, ef.stopngo)
+                        for ef in efs
+                    ]
+                ),
+            )
+            for key, efs in efs_by_veh_and_fuel.items()
+            if key in vehicle_fuel_combs
+        }
+
         srid = Settings.get_current().srid
-        emis_by_veh_and_subst = {}
-        for fleet_member in self.fleet.vehicles.all():
+        # annual average day vehicle flow times road length, converted to s⁻¹
+        road_flow = (
+            self.aadt * self.geom.transform(srid, clone=True).length / (3600 * 24)
+        )
+        heavy_share = self.heavy_vehicle_share or self.fleet.default_heavy_vehicle_share
+        emis_by_veh_and_subst = defaultdict(lambda: defaultdict(float))
+        for fleet_member in (
+            self.fleet.vehicles.select_related("vehicle", "timevar")
+            .only("fraction", "coldstart_fraction", "vehicle", "timevar")
+            .prefetch_related("fuels")
+        ):
             veh = fleet_member.vehicle
+            fleet_share = heavy_share if veh.isheavy else 1 - heavy_share
             if self.congestion_profile is None:
                 conditions = {
                     "freeflow": 1.0,
@@ -347,67 +425,42 @@ class RoadSource(SourceBase):
             else:
                 timevar = fleet_member.timevar or FlowTimevar()
                 conditions = self.congestion_profile.get_fractions(timevar)
+            weights = np.array(
+                [
+                    fleet_member.coldstart_fraction,
+                    conditions["freeflow"],
+                    conditions["heavy"],
+                    conditions["saturated"],
+                    conditions["stopngo"],
+                ]
+            )
 
             for fleet_member_fuel in fleet_member.fuels.all():
                 try:
-                    activitycodes = vehicle_fuel_combs[
+                    ef_substances, coeffs = ef_coeffs[
                         (veh.id, fleet_member_fuel.fuel_id)
                     ]
                 except KeyError:
-                    # if vehicle fuel combination is not valid
-                    # no emissions are calculated
+                    # no emission factors, or an excluded vehicle fuel combination
                     continue
-
-                # Check if activity codes matches code filters
-                # if not, the vehicle-fuel combination is excluded
-                for ac, ac_filter in zip(activitycodes, (ac1, ac2, ac3)):
-                    if ac_filter is not None and (
-                        ac is None or not ac.matches(ac_filter)
-                    ):
-                        continue
-
-                efs = self.roadclass.traffic_situation.emissionfactors.filter(
-                    vehicle=veh,
-                    fuel=fleet_member_fuel.fuel,
+                emissions = (
+                    road_flow
+                    * fleet_share
+                    * fleet_member.fraction
+                    * fleet_member_fuel.fraction
+                    * (coeffs @ weights)
                 )
-                if substance is not None:
-                    efs = efs.filter(substance=substance)
-                for ef in efs:
-                    heavy_share = (
-                        self.heavy_vehicle_share
-                        or self.fleet.default_heavy_vehicle_share
-                    )
-                    fleet_share = heavy_share if veh.isheavy else 1 - heavy_share
-
-                    emis = (
-                        self.aadt
-                        * fleet_share
-                        * fleet_member.fraction
-                        * fleet_member_fuel.fraction
-                        * self.geom.transform(  # annual average day vehicle flow
-                            srid, clone=True
-                        ).length
-                        * (
-                            ef.coldstart * fleet_member.coldstart_fraction
-                            + ef.freeflow * conditions["freeflow"]
-                            + ef.heavy * conditions["heavy"]
-                            + ef.saturated * conditions["saturated"]
-                            + ef.stopngo * conditions["stopngo"]
-                        )
-                        / (3600 * 24)  # convert day⁻¹ to s⁻¹
-                    )
-                    if veh not in emis_by_veh_and_subst:
-                        emis_by_veh_and_subst[veh] = {}
-                    if ef.substance not in emis_by_veh_and_subst[veh]:
-                        emis_by_veh_and_subst[veh][ef.substance] = emis
-                    else:
-                        emis_by_veh_and_subst[veh][ef.substance] += emis
+                emis_by_subst = emis_by_veh_and_subst[veh]
+                for subst, emis in zip(ef_substances, emissions.tolist()):
+                    emis_by_subst[subst] += emis
 
         if by_vehicle is False:
-            agg_emis = {}
+            agg_emis = defaultdict(float)
             for substances in emis_by_veh_and_subst.values():
                 for subst, emis in substances.items():
-                    agg_emis[subst] = agg_emis.get(subst, 0) + emis
-            return agg_emis
+                    agg_emis[subst] += emis
+            return dict(agg_emis)
 
-        return emis_by_veh_and_subst
+        return {
+            veh: dict(substances) for veh, substances in emis_by_veh_and_subst.items()
+        }
@@ -1,7 +1,10 @@
 """Emission database models."""
 
+import re
+from functools import lru_cache
 
 from django.contrib.gis.db import models
+from django.db.models.functions import Collate, Concat
 
 from cetk.edb.const import CHAR_FIELD_LENGTH, WGS84_SRID
 from cetk.edb.ltreefield import LtreeField
@@ -29,7 +32,13 @@ class SourceSubstance(models.Model):
 
 
 def default_vertical_dist():
-    return "[[5.0, 1.0]]"
+    return [[5.0, 1.0]]
+
+
+@lru_cache(maxsize=4096)
+def _split_code(code):
+    """Return tuple of the '.'-separated parts of code, shared between instances."""
+    return tuple(code.split("."))
 
 
 class VerticalDist(BaseNamedModel):
@@ -39,9 +48,7 @@ class VerticalDist(BaseNamedModel):
 
     name = models.CharField(max_length=64)
     slug = models.SlugField(max_length=64, unique=True)
-    weights = models.CharField(
-        max_length=CHAR_FIELD_LENGTH, default=default_vertical_dist
-    )
+    weights = models.JSONField(default=default_vertical_dist)
 
     class Meta:
         db_table = "vertical_distributions"
@@ -98,10 +105,23 @@ class CodeSet(BaseNamedModel):
         return self.name
 
 
+class ActivityCodeManager(NaturalKeyManager):
+    """Database manager for activity codes."""
+
+    def get_by_natural_key(self, *key):
+        """Return an activity code given its natural key.
+
+        The code set is joined, since the natural key includes its slug.
+        """
+        return self.select_related("code_set").get(
+            **dict(zip(self.model.natural_key_fields, key))
+        )
+
+
 class ActivityCode(models.Model):
     """An abstract model for an activity code."""
 
-    objects = NaturalKeyManager()
+    objects = ActivityCodeManager()
     code = LtreeField(verbose_name="activity code")
     label = models.CharField(verbose_name="activity code label", max_length=100)
     code_set = models.ForeignKey(
@@ -118,6 +138,15 @@ class ActivityCode(models.Model):
                 fields=["code_set", "code"], name="unique code in codeset"
             )
         ]
+        # ltree lookups are implemented using LIKE, which is case-insensitive
+        # in SQLite and can only use an index on a column collated as nocase
+        indexes = [
+            models.Index(
+                models.F("code_set"),
+                Collate("code", "nocase"),
+                name="activitycode_code_idx",
+            )
+        ]
 
     def natural_key(self):
         return (self.code_set.slug, self.code)
@@ -129,6 +158,11 @@ class ActivityCode(models.Model):
         """Return a unicode representation of this activity code."""
         return self.code
 
+    @property
+    def code_parts(self):
+        """Return tuple of the '.'-separated parts of code."""
+        return _split_code(self.code)
+
     def matches(self, filters):
         """Compare with a (list of) filter code(s).
         args
@@ -137,22 +171,9 @@ class ActivityCode(models.Model):
         comparison is only made for code levels included in filter
         i.e. the code 1.A.2.i will match the filter 1.A
         """
-        code_parts = self.code.split(".")
-        for f in filters:
-            matches = True
-            filter_parts = f.code.split(".")
-            # filter has more code-parts than code
-            if len(filter_parts) > len(code_parts):
-                matches = False
-                continue
-            # compare code with filter part by part
-            for i, filter_part in enumerate(filter_parts):
-                if filter_part != code_parts[i]:
-                    matches = False
-                    break
-            if matches:
-                return matches
-        return matches
+        code_parts = self.code_parts
+        # a filter with more code-parts than the code gives a shorter slice
+        return any(code_parts[: len(f.code_parts)] == f.code_parts for f in filters)
 
     def get_decendents(self):
         return self.get_decendents_and_self().exclude(pk=self.pk)
@@ -166,8 +187,11 @@ class ActivityCode(models.Model):
         return self.get_ancestors_and_self().exclude(pk=self.pk)
 
     def get_ancestors_and_self(self):
-        return ActivityCode.objects.filter(code__aore=self.code).filter(
-            code_set=self.code_set
+        # exact prefixes are looked up in the (code_set, code) unique index
+        parts = self.code_parts
+        return ActivityCode.objects.filter(
+            code_set_id=self.code_set_id,
+            code__in=[".".join(parts[:i]) for i in range(1, len(parts) + 1)],
         )
 
     def get_parent(self):
@@ -176,24 +200,76 @@ class ActivityCode(models.Model):
                 f"The code: {self} cannot have a parent as it is a root node"
             )
         return ActivityCode.objects.get(
-            code__match=".".join(self.code.split(".")[:-1]), code_set=self.code_set
+            code__match=".".join(self.code_parts[:-1]), code_set=self.code_set
         )
 
+    @classmethod
+    def bulk_ancestors(cls, codes):
+        """Return dict {(code_set_id, code): activitycode} of ancestors of codes.
+
+        All ancestors are read in a single query, the parent of a code is then
+        found as (code.code_set_id, ".".join(code.code_parts[:-1])).
+        """
+        prefixes = {
+            ".".join(code.code_parts[:i])
+            for code in codes
+            for i in range(1, len(code.code_parts))
+        }
+        code_set_ids = {code.code_set_id for code in codes}
+        return {
+            (ancestor.code_set_id, ancestor.code): ancestor
+            for ancestor in cls.objects.filter(
+                code_set_id__in=code_set_ids, code__in=prefixes
+            )
+        }
+
+    def _get_codes_below(self, parent_code):
+        """Return codes in the same code set one level below parent_code.
+
+        Root codes are returned for an empty parent_code.
+        """
+        codes = ActivityCode.objects.filter(code_set_id=self.code_set_id)
+        if not parent_code:
+            return codes.exclude(code__contains=".")
+        # range scan on the (code_set, code) unique index, "/" follows "."
+        return codes.filter(
+            code__gt=parent_code + ".", code__lt=parent_code + "/"
+        ).exclude(code__regex=rf"^{re.escape(parent_code)}\.[^.]*\.")
+
     def get_siblings_and_self(self):
-        return ActivityCode.objects.filter(
-            code__match=".".join(self.code.split(".")[:-1]) + "._",
-            code_set=self.code_set,
-        )
+        return self._get_codes_below(".".join(self.code_parts[:-1]))
 
     def get_siblings(self):
         return self.get_siblings_and_self().exclude(pk=self.pk)
 
     def get_children(self):
-        return self.code_set.codes.filter(code__match=self.code + "._")
+        # code_set must not be deferred, the manager joins it with select_related
+        return self._get_codes_below(self.code).only("code_set", "code", "label")
+
+    @classmethod
+    def tree_queryset(cls, code_set):
+        """Return codes of code_set ordered by code, with vertical distributions."""
+        return code_set.codes.select_related("vertical_dist").order_by("code")
+
+    @classmethod
+    def with_leaf_flag(cls, queryset):
+        """Annotate codes in queryset with has_descendants.
+
+        is_leaf of the annotated codes is then evaluated without a query per code.
+        """
+        descendants = cls.objects.filter(
+            code_set=models.OuterRef("code_set"),
+            code__startswith=Concat(models.OuterRef("code"), models.Value(".")),
+        )
+        return queryset.annotate(has_descendants=models.Exists(descendants))
 
     def is_leaf(self):
         """Return True if code is a leaf (i.e. has no sub-codes)."""
-        return not self.get_decendents().exists()
+        if hasattr(self, "has_descendants"):
+            return not self.has_descendants
+        return not ActivityCode.objects.filter(
+            code_set_id=self.code_set_id, code__startswith=self.code + "."
+        ).exists()
 
 
 class SourceBase(models.Model):
@@ -218,8 +294,14 @@ class SourceBase(models.Model):
 class PointAreaGridSourceBase(SourceBase):
     """Abstract base model for point, area and grid sources"""
 
+    # nullable foreign keys are indexed by the partial indexes in Meta
     timevar = models.ForeignKey(
-        "Timevar", on_delete=models.SET_NULL, related_name="+", null=True, blank=True
+        "Timevar",
+        on_delete=models.SET_NULL,
+        related_name="+",
+        null=True,
+        blank=True,
+        db_index=False,
     )
     activitycode1 = models.ForeignKey(
         "ActivityCode",
@@ -227,6 +309,7 @@ class PointAreaGridSourceBase(SourceBase):
         related_name="+",
         null=True,
         blank=True,
+        db_index=False,
     )
     activitycode2 = models.ForeignKey(
         "ActivityCode",
@@ -234,6 +317,7 @@ class PointAreaGridSourceBase(SourceBase):
         related_name="+",
         null=True,
         blank=True,
+        db_index=False,
     )
     activitycode3 = models.ForeignKey(
         "ActivityCode",
@@ -241,15 +325,33 @@ class PointAreaGridSourceBase(SourceBase):
         related_name="+",
         null=True,
         blank=True,
+        db_index=False,
     )
 
     class Meta:
         abstract = True
+        # activitycode1 is the leading column of the activities index,
+        # the other keys are indexed only where they are set
         indexes = [
             models.Index(
                 fields=("activitycode1", "activitycode2", "activitycode3"),
                 name="%(class)s_activities_idx",
             ),
+            models.Index(
+                fields=("activitycode2",),
+                condition=models.Q(activitycode2__isnull=False),
+                name="%(class)s_activitycode2_idx",
+            ),
+            models.Index(
+                fields=("activitycode3",),
+                condition=models.Q(activitycode3__isnull=False),
+                name="%(class)s_activitycode3_idx",
+            ),
+            models.Index(
+                fields=("timevar",),
+                condition=models.Q(timevar__isnull=False),
+                name="%(class)s_timevar_idx",
+            ),
         ]
 
 
@@ -300,10 +402,10 @@ class PointSource(PointAreaGridSourceBase):
         "the position of the point-source",
         srid=WGS84_SRID,
         geography=True,
-        db_index=True,
     )
+    # indexed as the leading column of the unique facility and name constraint
     facility = models.ForeignKey(
-        "Facility", on_delete=models.SET_NULL, null=True, blank=True
+        "Facility", on_delete=models.SET_NULL, null=True, blank=True, db_index=False
     )
 
     class Meta(PointAreaGridSourceBase.Meta):
@@ -314,7 +416,7 @@ class PointSource(PointAreaGridSourceBase):
 class PointSourceSubstance(SourceSubstance):
     """A point-source substance emission."""
 
-    source = models.ForeignKey("PointSource", on_delete=models.CASCADE)
+    source = models.ForeignKey("PointSource", on_delete=models.CASCADE, db_index=False)
 
 
 class SourceActivity(models.Model):
@@ -337,7 +439,7 @@ class SourceActivity(models.Model):
 class PointSourceActivity(SourceActivity):
     """An emitting activity of a point source."""
 
-    source = models.ForeignKey("PointSource", on_delete=models.CASCADE)
+    source = models.ForeignKey("PointSource", on_delete=models.CASCADE, db_index=False)
 
     def __str__(self):
         return "{}".format(self.activity.name)
@@ -368,10 +470,11 @@ class AreaSource(PointAreaGridSourceBase):
     sourcetype = "area"
 
     geom = models.PolygonField(
-        "the extent of the area source", srid=WGS84_SRID, geography=True, db_index=True
+        "the extent of the area source", srid=WGS84_SRID, geography=True
     )
+    # indexed as the leading column of the unique facility and name constraint
     facility = models.ForeignKey(
-        "Facility", on_delete=models.SET_NULL, null=True, blank=True
+        "Facility", on_delete=models.SET_NULL, null=True, blank=True, db_index=False
     )
 
     class Meta(PointAreaGridSourceBase.Meta):
@@ -387,7 +490,7 @@ class AreaSource(PointAreaGridSourceBase):
 class AreaSourceActivity(SourceActivity):
     """An emitting activity of an area source."""
 
-    source = models.ForeignKey("AreaSource", on_delete=models.CASCADE)
+    source = models.ForeignKey("AreaSource", on_delete=models.CASCADE, db_index=False)
 
     def __str__(self):
         return f"{self.activity.name}"
@@ -396,4 +499,4 @@ class AreaSourceActivity(SourceActivity):
 class AreaSourceSubstance(SourceSubstance):
     """An area-source substance emission."""
 
-    source = models.ForeignKey("AreaSource", on_delete=models.CASCADE)
+    source = models.ForeignKey("AreaSource", on_delete=models.CASCADE, db_index=False)
@@ -1,4 +1,4 @@
-import ast
+from functools import lru_cache
 
 import numpy as np
 import pandas as pd
@@ -9,16 +9,27 @@ from cetk.edb.models.common_models import Settings
 
 
 def default_timevar_typeday():
-    return str(24 * [7 * [100.0]])
+    return 24 * [7 * [100.0]]
 
 
 def default_timevar_month():
-    return str(12 * [100.0])
+    return 12 * [100.0]
 
 
-def get_normalization_constant(typeday, month, timezone):
+@lru_cache(maxsize=None)
+def _commonyear_indices(timezone):
+    """Return hour, weekday and month index arrays for a common year in timezone."""
     commonyear = pd.date_range("2018", periods=24 * 365, freq="h", tz=timezone)
-    values = typeday[commonyear.hour, commonyear.weekday] * month[commonyear.month - 1]
+    return (
+        commonyear.hour.to_numpy(),
+        commonyear.weekday.to_numpy(),
+        commonyear.month.to_numpy() - 1,
+    )
+
+
+def get_normalization_constant(typeday, month, timezone):
+    hours, weekdays, months = _commonyear_indices(timezone)
+    values = typeday[hours, weekdays] * month[months]
     return len(values) / values.sum()
 
 
@@ -28,8 +39,8 @@ def timevar_to_series(time_index, *timevars, timezone=None):
         raise TypeError("at least one timevar must be given")
     if timezone is None:
         timezone = Settings.get_current().timezone
-    typeday = np.multiply.reduce([ast.literal_eval(t.typeday) for t in timevars])
-    month = np.multiply.reduce([ast.literal_eval(t.month) for t in timevars])
+    typeday = np.multiply.reduce([t.typeday for t in timevars])
+    month = np.multiply.reduce([t.month for t in timevars])
     if len(timevars) > 1:
         normalization_constant = get_normalization_constant(typeday, month, timezone)
     else:
@@ -47,8 +58,8 @@ def timevar_normalize(timevar, timezone=None):
     """Set the normalization constants on a timevar instance."""
     if timezone is None:
         timezone = Settings.get_current().timezone
-    typeday = np.array(ast.literal_eval(timevar.typeday))
-    month = np.array(ast.literal_eval(timevar.month))
+    typeday = np.array(timevar.typeday)
+    month = np.array(timevar.month)
     timevar.typeday_sum = typeday.sum()
     timevar._normalization_constant = get_normalization_constant(
         typeday, month, timezone
@@ -59,13 +70,10 @@ def timevar_normalize(timevar, timezone=None):
 class TimevarBase(models.Model):
     name = models.CharField(max_length=CHAR_FIELD_LENGTH, unique=True)
 
-    typeday = models.CharField(
-        max_length=10 * len(default_timevar_typeday()),
-        default=default_timevar_typeday(),
-    )
-    month = models.CharField(
-        max_length=10 * len(default_timevar_month()), default=default_timevar_month()
-    )
+    # profiles are stored as nested lists of hourly values for each weekday
+    # and of monthly values, loaded without parsing a list literal
+    typeday = models.JSONField(default=default_timevar_typeday)
+    month = models.JSONField(default=default_timevar_month)
 
     # pre-calculated normalization constants
     typeday_sum = models.FloatField(editable=False)
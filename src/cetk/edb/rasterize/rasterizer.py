@@ -21,6 +21,7 @@ from cetk import __version__
 from cetk.edb.cache import EmissionCache, NotInCacheError
 from cetk.edb.models import (
     VELOCITY_CHOICES,
+    ActivityCode,
     AreaSource,
     ColdstartTimevar,
     CongestionProfile,
@@ -201,13 +202,10 @@ class EmissionRasterizer:
         weights = np.zeros(self.levels.shape, dtype=float)
         # cache vertical distributions to used for different activitycodes
         # heights are determined using the 1st (primary) codeset
-        for ac in (
-            Settings.get_current()
-            .codeset1.codes.prefetch_related("vertical_dist")
-            .exclude(vertical_dist__isnull=True)
+        for ac in ActivityCode.tree_queryset(Settings.get_current().codeset1).exclude(
+            vertical_dist__isnull=True
         ):
-            # eval is needed in cetk because arrays stored as CharField in sqlite
-            vdist = np.array(eval(ac.vertical_dist.weights))
+            vdist = np.array(ac.vertical_dist.weights)
             vdist_weights = vdist[:, 1]
             vdist_heights = vdist[:, 0]
 
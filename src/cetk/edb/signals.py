@@ -8,6 +8,9 @@ from django.dispatch import receiver
 DEFAULT_TRAFFIC_CONDITIONS = str(24 * [7 * [1.0]])
 DEFAULT_TRAFFIC_FLOW = str(24 * [7 * [100.0]])
 
+# page cache size of sqlite connections [KiB]
+SQLITE_CACHE_SIZE_KIB = 64 * 1024
+
 
 def condition_weight(
     cond_str: Union[str, None],
@@ -40,4 +43,9 @@ def condition_weight(
 
 @receiver(connection_created)
 def extend_sqlite(connection=None, **kwargs):
+    if connection.vendor != "sqlite":
+        return
     connection.connection.create_function("condition_weight", 4, condition_weight)
+    # a larger page cache keeps indexes in memory during bulk imports
+    # (negative values are in KiB), the default is 2 MiB
+    connection.connection.execute(f"PRAGMA cache_size = -{SQLITE_CACHE_SIZE_KIB}")
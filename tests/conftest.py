@@ -81,7 +81,7 @@ def activities(db):
 @pytest.fixture()
 def vertical_dist(db):
     vdist = models.VerticalDist.objects.create(
-        name="vdist1", weights="[[5.0, 0.4], [10.0, 0.6]]"
+        name="vdist1", weights=[[5.0, 0.4], [10.0, 0.6]]
     )
     return vdist
 
@@ -93,7 +93,7 @@ def test_timevar(db):
     daytime_profile[:7, :] = 0
     daytime_profile[23:, :] = 0
     test_timevar = models.Timevar.objects.create(
-        name="daytime", typeday=str(daytime_profile.tolist())
+        name="daytime", typeday=daytime_profile.tolist()
     )
     return test_timevar
 
@@ -127,7 +127,7 @@ def test_flowtimevar(db):
     daytime_profile[:7, :] = 0
     daytime_profile[23:, :] = 0
     test_flowtimevar = models.FlowTimevar.objects.create(
-        name="daytime", typeday=str(daytime_profile.tolist())
+        name="daytime", typeday=daytime_profile.tolist()
     )
     return test_flowtimevar
 
@@ -137,7 +137,7 @@ def test_flowtimevar_constant(db):
     # array representing daytime activity
     constant_profile = np.ones((24, 7)) * 100
     test_flowtimevar = models.FlowTimevar.objects.create(
-        name="constant", typeday=str(constant_profile.tolist())
+        name="constant", typeday=constant_profile.tolist()
     )
     return test_flowtimevar
 
@@ -147,7 +147,7 @@ def test_coldstarttimevar(db):
     # array representing constant timevar
     daytime_profile = np.ones((24, 7)) * 100
     test_timevar = models.ColdstartTimevar.objects.create(
-        name="daytime", typeday=str(daytime_profile.tolist())
+        name="daytime", typeday=daytime_profile.tolist()
     )
     return test_timevar
 
@@ -309,10 +309,10 @@ def roadsources(roadclasses, fleets):
     test_profile[:7, :] = 2
     test_profile[23:, :] = 2
     models.CongestionProfile.objects.create(
-        name="free-flow", traffic_condition=str(test_profile.tolist())
+        name="free-flow", traffic_condition=test_profile.tolist()
     )
     models.CongestionProfile.objects.create(
-        name="heavy", traffic_condition=str(test_profile.tolist())
+        name="heavy", traffic_condition=test_profile.tolist()
     )
     freeflow = models.CongestionProfile.objects.get(name="free-flow")
     heavy = models.CongestionProfile.objects.get(name="heavy")
@@ -403,10 +403,10 @@ def congestionprofiles():
     test_profile[:7, :] = 2
     test_profile[23:, :] = 2
     congestion_profile1 = CongestionProfile.objects.create(
-        name="free-flow", traffic_condition=str(test_profile.tolist())
+        name="free-flow", traffic_condition=test_profile.tolist()
     )
     congestion_profile2 = CongestionProfile.objects.create(
-        name="heavy", traffic_condition=str(test_profile.tolist())
+        name="heavy", traffic_condition=test_profile.tolist()
     )
     return [congestion_profile1, congestion_profile2]
 
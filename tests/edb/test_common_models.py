@@ -1,7 +1,6 @@
 """Unit and regression tests for edb models."""
 
 # from collections import OrderedDict
-import ast
 
 import numpy as np
 import pytest
@@ -29,6 +28,14 @@ class TestActivityCodes:
         ac2, created = code_set.codes.get_or_create(code="actcode2", label="label2")
         assert created
 
+    def test_get_by_natural_key(self, code_sets, django_assert_num_queries):
+        code_set = code_sets[0]
+        with django_assert_num_queries(1):
+            ac = source_models.ActivityCode.objects.get_by_natural_key(
+                code_set.slug, "1.3"
+            )
+            assert ac.natural_key() == (code_set.slug, "1.3")
+
     def test_get_children(self, code_sets):
         code_set = code_sets[0]
         ac1 = code_set.codes.get(code="1")
@@ -39,6 +46,46 @@ class TestActivityCodes:
         assert ac131 not in list(ac1.get_children())
         assert ac131 in list(ac13.get_children())
 
+    def test_get_siblings(self, code_sets):
+        code_set = code_sets[0]
+        ac131 = code_set.codes.get(code="1.3.1")
+        assert [ac.code for ac in ac131.get_siblings()] == ["1.3.2"]
+        ac2 = code_set.codes.get(code="2")
+        assert sorted(ac.code for ac in ac2.get_siblings_and_self()) == ["1", "2", "3"]
+
+    def test_is_leaf(self, code_sets):
+        code_set = code_sets[0]
+        leafs = {ac.code: ac.is_leaf() for ac in code_set.codes.all()}
+        codes = source_models.ActivityCode.with_leaf_flag(code_set.codes.all())
+        assert {ac.code: ac.is_leaf() for ac in codes} == leafs
+        assert not leafs["1"]
+        assert not leafs["1.3"]
+        assert leafs["1.3.1"]
+        assert leafs["3"]
+
+    def test_matches(self, code_sets):
+        code_set = code_sets[0]
+        ac1 = code_set.codes.get(code="1")
+        ac13 = code_set.codes.get(code="1.3")
+        ac131 = code_set.codes.get(code="1.3.1")
+        ac2 = code_set.codes.get(code="2")
+        assert ac131.matches([ac1])
+        assert ac131.matches([ac2, ac13])
+        assert not ac13.matches([ac131])
+        assert not ac13.matches([ac2])
+        assert not ac13.matches([])
+
+    def test_matches_after_code_change(self, code_sets):
+        code_set = code_sets[0]
+        ac1 = code_set.codes.get(code="1")
+        ac2 = code_set.codes.get(code="2")
+        ac = source_models.ActivityCode(code="1.3", code_set=code_set)
+        assert ac.matches([ac1])
+        ac.code = "2.1"
+        assert ac.code_parts == ("2", "1")
+        assert ac.matches([ac2])
+        assert not ac.matches([ac1])
+
     def test_get_parent(self, code_sets):
         code_set = code_sets[0]
         ac1 = code_set.codes.get(code="1")
@@ -49,6 +96,24 @@ class TestActivityCodes:
         with pytest.raises(RuntimeError):
             ac1.get_parent()
 
+    def test_get_ancestors(self, code_sets):
+        ac131 = code_sets[0].codes.get(code="1.3.1")
+        assert sorted(ac.code for ac in ac131.get_ancestors()) == ["1", "1.3"]
+        assert sorted(ac.code for ac in ac131.get_ancestors_and_self()) == [
+            "1",
+            "1.3",
+            "1.3.1",
+        ]
+
+    def test_bulk_ancestors(self, code_sets):
+        code_set = code_sets[0]
+        codes = list(code_set.codes.filter(code__in=["1.3.1", "2.1"]))
+        ancestors = source_models.ActivityCode.bulk_ancestors(codes)
+        assert sorted(code for _, code in ancestors) == ["1", "1.3", "2"]
+        for code in codes:
+            parent = ancestors[code.code_set_id, ".".join(code.code_parts[:-1])]
+            assert parent == code.get_parent()
+
 
 class TestVerticalDist:
     def test_create_vertical_dist(self, code_sets):
@@ -56,10 +121,10 @@ class TestVerticalDist:
         code_set = code_sets[0]  # noqa
         vdist = source_models.VerticalDist.objects.create(
             name="residential heating",
-            weights="[[5, 0], [10, 0.3], [15, 0.7]]",
+            weights=[[5, 0], [10, 0.3], [15, 0.7]],
             slug="residential_heating",
         )
-        assert len(np.array(ast.literal_eval(vdist.weights))) == 3
+        assert len(np.array(vdist.weights)) == 3
 
     def test_str(self, vertical_dist):
         assert str(vertical_dist) == vertical_dist.name
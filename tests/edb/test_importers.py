@@ -1,24 +1,44 @@
 """Tests for emission model importers."""
 
 from importlib import resources
+from pathlib import Path
 
+import pandas as pd
 import pytest
+from django.contrib.gis.geos import Polygon
+from openpyxl import Workbook, load_workbook
 
+from cetk.edb.const import WGS84_SRID
 from cetk.edb.importers import (
     import_gridsources,
     import_sourceactivities,
     import_sources,
 )
+from cetk.edb.importers import utils as importer_utils
+from cetk.edb.importers.activity_import import import_emissionfactorsheet
+from cetk.edb.importers.utils import (
+    ValidationError,
+    calamine_sheet_values,
+    worksheet_to_dataframe,
+)
 from cetk.edb.models import (
     AreaSource,
     AreaSourceActivity,
     CodeSet,
+    EmissionFactor,
     GridSource,
+    GridSourceSubstance,
     PointSource,
     PointSourceActivity,
     get_gridsource_raster,
 )
-from cetk.edb.units import emis_conversion_factor_from_si
+from cetk.edb.units import activity_ef_unit_to_si, emis_conversion_factor_from_si
+
+POINTSOURCE_CSV_HEADER = (
+    "facility_id;facility_name;source_name;lat;lon;timevar;chimney_height;"
+    "outer_diameter;inner_diameter;gas_speed;gas_temperature[K];"
+    "subst:NOx;emission_unit\n"
+)
 
 
 @pytest.fixture
@@ -88,6 +108,92 @@ class TestImport:
         source1 = PointSource.objects.get(name="source1")
         assert "test_tag" not in source1.tags
 
+    def test_import_pointsources_duplicates(self, db, tmpdir):
+        filepath = Path(tmpdir) / "pointsources.csv"
+        filepath.write_text(
+            POINTSOURCE_CSV_HEADER
+            + "1-a;facility1;source1;10;20;;10;2;1;4;200;1;ton/year\n"
+            + "1-a;facility1;source2;10;20;;10;2;1;4;200;1;ton/year\n"
+            + "1-a;facility1;source1;11;21;;10;2;1;4;200;2;ton/year\n"
+        )
+        _, messages = import_sources(filepath, validation=True, sourcetype="point")
+        assert (
+            "VALIDATION: Non-unique combination of facility_id and source_name: "
+            "[('1-a', 'source1')]\n"
+        ) in messages
+        with pytest.raises(ValidationError):
+            import_sources(filepath, sourcetype="point")
+
+    def test_import_pointsources_invalid_coordinates(self, db, tmpdir):
+        filepath = Path(tmpdir) / "pointsources.csv"
+        filepath.write_text(
+            POINTSOURCE_CSV_HEADER
+            + "1-a;facility1;source1;10;20;;10;2;1;4;200;1;ton/year\n"
+            + "1-a;facility1;source2;;20;;10;2;1;4;200;1;ton/year\n"
+            + "1-a;facility1;source3;10;abc;;10;2;1;4;200;1;ton/year\n"
+        )
+        _, messages = import_sources(filepath, validation=True, sourcetype="point")
+        assert messages == [
+            "VALIDATION: missing coordinates for source '('1-a', 'source2')'\n",
+            "VALIDATION: Invalid point coordinates on row 4\n",
+        ]
+        # no sources are created without a valid position
+        assert list(PointSource.objects.values_list("name", flat=True)) == ["source1"]
+        with pytest.raises(ValidationError):
+            import_sources(filepath, sourcetype="point")
+
+    def test_import_pointsources_invalid_emission_unit(self, db, tmpdir):
+        filepath = Path(tmpdir) / "pointsources.csv"
+        filepath.write_text(
+            POINTSOURCE_CSV_HEADER
+            + "1-a;facility1;source1;10;20;;10;2;1;4;200;1;kg/fortnight\n"
+            + "1-a;facility1;source2;10;20;;10;2;1;4;200;1;kg\n"
+            + "1-a;facility1;source3;10;20;;10;2;1;4;200;1;ton/year\n"
+        )
+        _, messages = import_sources(filepath, validation=True, sourcetype="point")
+        assert messages == [
+            "VALIDATION: Missing data 'no conversion factor defined for time-unit"
+            " fortnight' on row 2 for point sources.\n",
+            "VALIDATION: Invalid point-source emission value 1 on row 3\n",
+        ]
+        with pytest.raises(ValidationError):
+            import_sources(filepath, sourcetype="point")
+
+    def test_import_pointsources_partial_chimney(self, db, tmpdir):
+        filepath = Path(tmpdir) / "pointsources.csv"
+        filepath.write_text(
+            POINTSOURCE_CSV_HEADER
+            + "1-a;facility1;source1;10;20;;;2;1;fast;200;1;ton/year\n"
+        )
+        _, messages = import_sources(filepath, validation=True, sourcetype="point")
+        assert messages == [
+            "VALIDATION: Missing value in PointSource sheet for chimney_height"
+            " on row 2\n",
+            "VALIDATION: Invalid value in PointSource sheet for gas_speed on row 2\n",
+        ]
+        # valid chimney properties are still imported
+        source = PointSource.objects.get(name="source1")
+        assert source.chimney_outer_diameter == 2.0
+        assert source.chimney_inner_diameter == 1.0
+        assert source.chimney_gas_temperature == 200.0
+        with pytest.raises(ValidationError):
+            import_sources(filepath, sourcetype="point")
+
+    def test_import_pointsources_unknown_codeset(self, db, tmpdir):
+        filepath = Path(tmpdir) / "pointsources.csv"
+        filepath.write_text(
+            POINTSOURCE_CSV_HEADER.replace("\n", ";activitycode_XYZ\n")
+            + "1-a;facility1;source1;10;20;;10;2;1;4;200;1;ton/year;1.3.1\n"
+            + "1-a;facility1;source2;10;20;;10;2;1;4;200;1;ton/year;\n"
+        )
+        _, messages = import_sources(filepath, validation=True, sourcetype="point")
+        assert messages == [
+            "VALIDATION: Specified activitycode 1.3.1 for unknown codeset XYZ"
+            " for point source on row 2\n"
+        ]
+        with pytest.raises(ValidationError):
+            import_sources(filepath, sourcetype="point")
+
     def test_import_pointsourceactivities(
         self, vertical_dist, pointsource_csv, pointsource_xlsx
     ):
@@ -108,11 +214,81 @@ class TestImport:
         # create pointsources
         filepath = resources.files("edb.data") / "pointsourceactivities.xlsx"
         # test if create pointsourceactivities works
-        import_sourceactivities(filepath)
-        assert PointSourceActivity.objects.all().count() > 0
+        updates, _ = import_sourceactivities(filepath)
+        assert PointSourceActivity.objects.all().count() == 3
+        assert updates["pointsourceactivity"] == {"created": 3, "updated": 0}
+        assert updates["emission_factors"] == {"created": 4, "updated": 0}
         # test if update also works
-        import_sourceactivities(filepath)
-        assert PointSourceActivity.objects.all().count() > 0
+        updates, _ = import_sourceactivities(filepath)
+        assert PointSourceActivity.objects.all().count() == 3
+        assert updates["pointsourceactivity"] == {"created": 0, "updated": 3}
+        # emission factors of updated activities are replaced
+        assert updates["emission_factors"] == {"created": 4, "updated": 0}
+
+    def test_import_emissionfactors(self, db):
+        workbook = Workbook()
+        worksheet = workbook.active
+        worksheet.title = "EmissionFactor"
+        worksheet.append(
+            [
+                "activity_name",
+                "substance",
+                "factor",
+                "emissionfactor_unit",
+                "activity_unit",
+            ]
+        )
+        worksheet.append(["wood", "PM2.5", 1.0, "g/GJ", "GJ/yr"])
+        worksheet.append(["wood", "XYZ", 2.0, "g/GJ", "GJ/yr"])
+        worksheet.append(["wood", "NOx", 3.0, "g/GJ", "GJ/yr"])
+        worksheet.append(["wood", "XYZ", 4.0, "g/GJ", "GJ/yr"])
+        updates, messages = import_emissionfactorsheet(workbook, validation=True)
+        assert messages == [
+            "VALIDATION: unknown substance 'XYZ' for emission factor on row '1'\n",
+            "VALIDATION: unknown substance 'XYZ' for emission factor on row '3'\n",
+        ]
+        assert updates["emission_factors"] == {"created": 2, "updated": 0}
+        assert sorted(
+            EmissionFactor.objects.values_list("substance__slug", flat=True)
+        ) == ["NOx", "PM25"]
+        emfac = EmissionFactor.objects.get(
+            activity__name="wood", substance__slug="PM25"
+        )
+        assert emfac.factor == pytest.approx(activity_ef_unit_to_si(1.0, "g/GJ"))
+        # without validation, the first error in row order is raised
+        with pytest.raises(ValidationError) as excinfo:
+            import_emissionfactorsheet(workbook, validation=False)
+        assert str(excinfo.value) == (
+            "VALIDATION: unknown substance 'XYZ' for emission factor on row '1'"
+        )
+
+    def test_import_emissionfactor_errors(self, db):
+        workbook = Workbook()
+        worksheet = workbook.active
+        worksheet.title = "EmissionFactor"
+        worksheet.append(
+            [
+                "activity_name",
+                "substance",
+                "factor",
+                "emissionfactor_unit",
+                "activity_unit",
+            ]
+        )
+        worksheet.append(["wood", "NOx", 1.0, "g/GJ", "GJ/yr"])
+        worksheet.append(["wood", "SOx", 1.0, "g/m3", "GJ/yr"])
+        worksheet.append(["wood", "NOx", 2.0, "g/GJ", "GJ/yr"])
+        worksheet.append(["oil", "NOx", 1.0, "xx/GJ", "GJ/yr"])
+        worksheet.append(["oil", "ABC", 1.0, "g/GJ", "GJ/yr"])
+        _, messages = import_emissionfactorsheet(workbook, validation=True)
+        assert messages == [
+            "VALIDATION: Units for emission factor and activity rate for 'wood'"
+            " are inconsistent, convert units before importing.\n",
+            "VALIDATION: Two emission factors for same activity and substance"
+            " on row '2'\n",
+            "VALIDATION: unknown mass-unit 'xx' for emission factor on row '3'\n",
+            "VALIDATION: unknown substance 'ABC' for emission factor on row '4'\n",
+        ]
 
     def test_import_areasources(self, vertical_dist, areasource_xlsx):
 
@@ -132,6 +308,38 @@ class TestImport:
         import_sources(areasource_xlsx, sourcetype="area")
         assert AreaSource.objects.all().count() > 0
 
+    def test_import_areasources_srid(self, tmpdir, vertical_dist):
+        cs1 = CodeSet.objects.create(name="SNAP", slug="SNAP")
+        cs1.codes.create(code="1.3", label="Energy", vertical_dist=vertical_dist)
+        polygon = Polygon(
+            ((18.0, 59.0), (18.01, 59.0), (18.01, 59.01), (18.0, 59.0)),
+            srid=WGS84_SRID,
+        )
+        header = (
+            "facility_id;facility_name;source_name;geometry;timevar;"
+            "activitycode_SNAP;subst:NOx;emission_unit\n"
+        )
+        # polygon given in a projected CRS (SWEREF99 TM)
+        filepath = Path(tmpdir) / "areasources_sweref.csv"
+        filepath.write_text(
+            header
+            + f"1;facility1;source1;{polygon.transform(3006, clone=True).wkt};"
+            + ";1.3;1;ton/year\n"
+        )
+        import_sources(filepath, srid=3006, sourcetype="area")
+        # polygon given in WGS84, no srid specified
+        filepath = Path(tmpdir) / "areasources_wgs84.csv"
+        filepath.write_text(
+            header + f"1;facility1;source2;{polygon.wkt};;1.3;1;ton/year\n"
+        )
+        import_sources(filepath, sourcetype="area")
+
+        for name in ("source1", "source2"):
+            geom = AreaSource.objects.get(name=name).geom
+            assert geom.srid == WGS84_SRID
+            for coords, ref_coords in zip(geom.coords[0], polygon.coords[0]):
+                assert coords == pytest.approx(ref_coords, abs=1e-7)
+
     def test_import_areasourceactivities(self, vertical_dist):
         vdist = vertical_dist  # noqa
 
@@ -153,6 +361,12 @@ class TestImport:
         assert (
             len(messages) == 0
         ), f"errors importing gridsources: {', '.join(messages)}"
+        assert updates == {"gridsources": {"updated": 0, "created": 4}}
+        nr_substances = {
+            source.name: source.substances.count()
+            for source in GridSource.objects.all()
+        }
+        assert sum(nr_substances.values()) == GridSourceSubstance.objects.count()
         source1 = GridSource.objects.get(name="gridsource1")
         source2 = GridSource.objects.get(name="gridsource2")
         assert source1.name == "gridsource1"
@@ -183,10 +397,60 @@ class TestImport:
         # modify a source
         source1.tags["test_tag"] = "test"
         source1.save()
+        source1_pm25.value = 0.0
+        source1_pm25.save()
 
         # re-import gridsources from file
-        # and check that existing source is updated
-        import_gridsources(filepath)
+        # and check that existing sources and their emissions are replaced
+        updates, messages = import_gridsources(filepath)
+        assert len(messages) == 0
+        assert updates == {"gridsources": {"updated": 4, "created": 0}}
         source1 = GridSource.objects.get(name="gridsource1")
         source2 = GridSource.objects.get(name="gridsource2")
         assert "test_tag" not in source1.tags
+        assert {
+            source.name: source.substances.count()
+            for source in GridSource.objects.all()
+        } == nr_substances
+        assert sum(nr_substances.values()) == GridSourceSubstance.objects.count()
+        source1_pm25 = source1.substances.get(substance__slug="PM25")
+        emis_value = source1_pm25.value * emis_conversion_factor_from_si("ton/year")
+        assert emis_value == pytest.approx(5378.204285, 1e-4)
+        assert source2.substances.get(substance__slug="NOx").value == source2_nox.value
+
+
+@pytest.mark.parametrize(
+    "filename,sheetname",
+    [("pointsources.xlsx", "PointSource"), ("areasources.xlsx", "AreaSource")],
+)
+def test_calamine_sheet_values(monkeypatch, filename, sheetname):
+    """Spreadsheets read using python-calamine give the same data as openpyxl."""
+    pytest.importorskip("python_calamine")
+    monkeypatch.setattr(importer_utils, "CALAMINE_MIN_FILE_SIZE", 0)
+    filepath = resources.files("edb.data") / filename
+    assert importer_utils.use_calamine(filepath)
+
+    workbook = load_workbook(filename=filepath, data_only=True, read_only=True)
+    # as in the importers, a single sheet is read irrespective of its name
+    if len(workbook.worksheets) == 1:
+        worksheet = workbook.worksheets[0]
+    else:
+        worksheet = workbook[sheetname]
+    df_ref = worksheet_to_dataframe(worksheet.values)
+    df = worksheet_to_dataframe(calamine_sheet_values(filepath, sheetname))
+    pd.testing.assert_frame_equal(df, df_ref)
+
+
+def test_use_calamine(monkeypatch):
+    """Only spreadsheets larger than the threshold are read using python-calamine."""
+    filepath = resources.files("edb.data") / "pointsources.xlsx"
+    size = filepath.stat().st_size
+    # the switch does not depend on python-calamine being installed
+    monkeypatch.setattr(importer_utils, "CalamineWorkbook", object)
+    monkeypatch.setattr(importer_utils, "CALAMINE_MIN_FILE_SIZE", size - 1)
+    assert importer_utils.use_calamine(filepath)
+    monkeypatch.setattr(importer_utils, "CALAMINE_MIN_FILE_SIZE", size)
+    assert not importer_utils.use_calamine(filepath)
+    monkeypatch.setattr(importer_utils, "CALAMINE_MIN_FILE_SIZE", 0)
+    monkeypatch.setattr(importer_utils, "CalamineWorkbook", None)
+    assert not importer_utils.use_calamine(filepath)
@@ -0,0 +1,63 @@
+"""Tests for data migrations of the edb app."""
+
+import numpy as np
+import pytest
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+
+from cetk.edb.models import (
+    ColdstartTimevar,
+    CongestionProfile,
+    FlowTimevar,
+    Timevar,
+    VerticalDist,
+)
+
+BEFORE_JSON = [("edb", "0004_activitycode_code_idx")]
+
+
+def migrate(targets):
+    """Migrate the test database to targets and return the historical apps."""
+    executor = MigrationExecutor(connection)
+    executor.migrate(targets)
+    executor.loader.build_graph()
+    return executor.loader.project_state(targets).apps
+
+
+@pytest.mark.django_db(transaction=True, serialized_rollback=True)
+def test_profiles_migrated_to_json():
+    apps = migrate(BEFORE_JSON)
+    typeday = 24 * [7 * [100.0]]
+    month = 12 * [100.0]
+    # formats written by earlier versions of the importers
+    typeday_str = str(typeday)
+    month_str = np.array2string(np.array(month)).replace("\n", "").replace(" ", ", ")
+    for model_name in ("timevar", "flowtimevar", "coldstarttimevar"):
+        apps.get_model("edb", model_name).objects.create(
+            name="old",
+            typeday=typeday_str,
+            month=month_str,
+            typeday_sum=16800.0,
+            _normalization_constant=1.0,
+        )
+    apps.get_model("edb", "verticaldist").objects.create(
+        name="old", slug="old", weights=str([[5.0, 0.5], [10.0, 0.5]])
+    )
+    traffic_condition = np.ones((24, 7), dtype=int)
+    traffic_condition[7:9, :5] = 3
+    apps.get_model("edb", "congestionprofile").objects.create(
+        name="old",
+        traffic_condition=np.array2string(traffic_condition, separator=",").replace(
+            "\n", ""
+        ),
+    )
+
+    migrate(MigrationExecutor(connection).loader.graph.leaf_nodes())
+
+    for model in (Timevar, FlowTimevar, ColdstartTimevar):
+        timevar = model.objects.get(name="old")
+        assert timevar.typeday == typeday
+        assert timevar.month == month
+    assert VerticalDist.objects.get(name="old").weights == [[5.0, 0.5], [10.0, 0.5]]
+    profile = CongestionProfile.objects.get(name="old")
+    assert profile.traffic_condition == traffic_condition.tolist()
@@ -1,4 +1,3 @@
-import ast
 from contextlib import ExitStack
 from importlib import resources
 
@@ -168,12 +167,10 @@ def test_import_timevars(db, get_data_file):
     import_timevars(get_yaml_data(timevarfile))
     assert FlowTimevar.objects.all().count() == 2
     turist = FlowTimevar.objects.get(name="tourist (heavy)")
-    turist_typeday = ast.literal_eval(turist.typeday)
-    assert turist_typeday[1][1] == 253
+    assert turist.typeday[1][1] == 253
     assert ColdstartTimevar.objects.all().count() == 1
     kall = ColdstartTimevar.objects.get(name="all")
-    kall_typeday = ast.literal_eval(kall.typeday)
-    assert kall_typeday[1][1] == 1154
+    assert kall.typeday[1][1] == 1154
     assert Timevar.objects.all().count() == 1
 
     # test overwriting
@@ -189,7 +186,7 @@ def test_import_congestion_profiles(db, get_data_file):
     import_congestion_profiles(profile_data)
     assert CongestionProfile.objects.all().count() == 2
     profile = CongestionProfile.objects.get(name="busy")
-    assert ast.literal_eval(profile.traffic_condition)[6][0] == 2
+    assert profile.traffic_condition[6][0] == 2
 
     # test overwriting
     import_congestion_profiles(profile_data, overwrite=True)
@@ -8,7 +8,16 @@ import pytest
 from django.contrib.gis.geos import LineString
 from django.db import IntegrityError
 
-from cetk.edb.models import CongestionProfile, RoadSource, Substance, Vehicle
+from cetk.edb.models import (
+    CongestionProfile,
+    FlowTimevar,
+    RoadSource,
+    Settings,
+    Substance,
+    Vehicle,
+    VehicleFuelComb,
+)
+from cetk.edb.units import vehicle_ef_unit_to_si
 
 SWEREF99_TM_SRID = 3006
 WGS84_SRID = 4326
@@ -35,7 +44,7 @@ class TestCongestionProfile:
 
         congestion_profile = CongestionProfile.objects.create(
             name="test congestion profile",
-            traffic_condition=str(test_profile.tolist()),
+            traffic_condition=test_profile.tolist(),
         )
 
         conditions = congestion_profile.get_fractions(constant_timevar)
@@ -44,6 +53,20 @@ class TestCongestionProfile:
         assert conditions["saturated"] == pytest.approx(7 / (24 * 7), 1e-6)
         assert conditions["stopngo"] == 0
 
+    def test_fractions_after_profile_change(self):
+        congestion_profile = CongestionProfile(traffic_condition=24 * [7 * [1]])
+        timevar = FlowTimevar(id=1)
+        assert congestion_profile.get_fractions(timevar)["freeflow"] == 1.0
+        congestion_profile.traffic_condition = 12 * [7 * [1]] + 12 * [7 * [3]]
+        conditions = congestion_profile.get_fractions(timevar)
+        assert conditions["freeflow"] == pytest.approx(0.5, 1e-6)
+        assert conditions["saturated"] == pytest.approx(0.5, 1e-6)
+        # same timevar with another flow profile
+        timevar.typeday = 12 * [7 * [0.0]] + 12 * [7 * [100.0]]
+        conditions = congestion_profile.get_fractions(timevar)
+        assert conditions["freeflow"] == 0.0
+        assert conditions["saturated"] == 1.0
+
     @pytest.mark.parametrize(
         "start,shift",
         # 2020-06-01 is a Monday
@@ -51,7 +74,7 @@ class TestCongestionProfile:
     )
     def test_to_series(self, start, shift):
         congestion = CongestionProfile(
-            id=123, traffic_condition=str([[1] * 7, [2] * 7, [3] * 7, [4] * 7] * 6)
+            id=123, traffic_condition=[[1] * 7, [2] * 7, [3] * 7, [4] * 7] * 6
         )
         time_index = pd.date_range(
             start, periods=24 * 7 * 2, freq="h", tz=datetime.timezone.utc
@@ -62,6 +85,15 @@ class TestCongestionProfile:
         )
         pd.testing.assert_series_equal(time_series, expected_time_series)
 
+    def test_to_series_after_profile_change(self):
+        congestion = CongestionProfile(traffic_condition=24 * [7 * [1]])
+        time_index = pd.date_range(
+            "2020-06-01", periods=24, freq="h", tz=datetime.timezone.utc
+        )
+        assert (congestion.to_series(time_index, timezone=time_index.tz) == 1).all()
+        congestion.traffic_condition = 24 * [7 * [2]]
+        assert (congestion.to_series(time_index, timezone=time_index.tz) == 2).all()
+
 
 class TestRoadSource:
     # @pytest.fixture
@@ -76,7 +108,7 @@ class TestRoadSource:
         test_profile[:7, :] = 2
         test_profile[23:, :] = 2
         CongestionProfile.objects.create(
-            name="free-flow", traffic_condition=str(test_profile.tolist())
+            name="free-flow", traffic_condition=test_profile.tolist()
         )
         freeflow = CongestionProfile.objects.get(name="free-flow")
         src1 = RoadSource.objects.create(
@@ -228,3 +260,45 @@ class TestRoadSources:
 
         ref_emis_by_veh_and_subst = road1.emission(substance=subst1)
         assert ref_emis_by_veh_and_subst[Vehicle.objects.get(name="car")][subst1] > 0
+
+    def test_road_emissions_filtered(
+        self, vehicles, vehicle_fuels, roadclasses, fleets, code_sets
+    ):
+        """Test filtered road emissions against hand-computed values."""
+        car, truck = vehicles
+        petrol, diesel = vehicle_fuels
+        ac1 = {ac.code: ac for ac in code_sets[0].codes.all()}
+        # move diesel cars out of the road traffic activity codes
+        VehicleFuelComb.objects.filter(vehicle=car, fuel=diesel).update(
+            activitycode1=ac1["2.1"]
+        )
+        nox = Substance.objects.get(slug="NOx")
+        sox = Substance.objects.get(slug="SOx")
+        road = RoadSource.objects.create(
+            name="road",
+            geom=LineString((17.1, 52.5), (17.15, 52.5), srid=WGS84_SRID),
+            aadt=1000,
+            speed=80,
+            width=20,
+            roadclass=roadclasses[0],
+            fleet=fleets[0],
+        )
+        srid = Settings.get_current().srid
+        road_flow = 1000 * road.geom.transform(srid, clone=True).length / (3600 * 24)
+        # free-flow traffic with 20% cold starts, same factors for all vehicles
+        ef = vehicle_ef_unit_to_si(100.0 + 0.2 * 10.0, "mg", "km")
+        # heavy vehicle share is 0.5, petrol and diesel fractions are 0.8 and 0.2
+        emis = road.emission(substance=nox, ac1=[ac1["1.3"]])
+        assert set(emis) == {car, truck}
+        assert set(emis[car]) == {nox}
+        assert emis[car][nox] == pytest.approx(road_flow * 0.5 * 0.8 * ef)
+        assert emis[truck][nox] == pytest.approx(road_flow * 0.5 * 1.0 * ef)
+
+        emis = road.emission(substance=nox, ac1=[ac1["1.3"]], by_vehicle=False)
+        assert emis[nox] == pytest.approx(road_flow * 0.5 * 1.8 * ef)
+
+        emis = road.emission(ac1=[ac1["1.3.1"], ac1["2"]], by_vehicle=False)
+        assert set(emis) == {nox, sox}
+        assert emis[sox] == pytest.approx(road_flow * 0.5 * 1.0 * ef)
+
+        assert road.emission(ac1=[ac1["3"]]) == {}
@@ -0,0 +1,29 @@
+"""Tests for time-variation models."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from cetk.edb.models.timevar_models import get_normalization_constant
+
+
+def reference_normalization_constant(typeday, month, timezone):
+    commonyear = pd.date_range("2018", periods=24 * 365, freq="h", tz=timezone)
+    values = typeday[commonyear.hour, commonyear.weekday] * month[commonyear.month - 1]
+    return len(values) / values.sum()
+
+
+def test_normalization_constant_timezones():
+    typeday = np.arange(1.0, 24 * 7 + 1).reshape(24, 7)
+    month = np.arange(1.0, 13)
+    constants = {}
+    # called in turn, so that cached index arrays of one timezone are reused
+    for timezone in ("UTC", "Europe/Stockholm", "UTC", "Europe/Stockholm"):
+        constant = get_normalization_constant(typeday, month, timezone)
+        assert constant == pytest.approx(
+            reference_normalization_constant(typeday, month, timezone)
+        )
+        constants.setdefault(timezone, constant)
+        assert constant == constants[timezone]
+    # daylight saving time shifts the hours of the typeday profile
+    assert constants["UTC"] != pytest.approx(constants["Europe/Stockholm"])
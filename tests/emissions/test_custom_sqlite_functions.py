@@ -1,8 +1,10 @@
 """Unit tests of custom sqlite functions."""
 
+import json
+
 from django.db import connection
 
-from cetk.edb.signals import condition_weight
+from cetk.edb.signals import SQLITE_CACHE_SIZE_KIB, condition_weight, extend_sqlite
 
 
 def test_condition_weight(test_flowtimevar, congestionprofiles):
@@ -10,32 +12,32 @@ def test_condition_weight(test_flowtimevar, congestionprofiles):
     congestion_profile1 = congestionprofiles[0]
 
     weight_freeflow = condition_weight(
-        congestion_profile1.traffic_condition,
-        test_flowtimevar.typeday,
+        json.dumps(congestion_profile1.traffic_condition),
+        json.dumps(test_flowtimevar.typeday),
         test_flowtimevar.typeday_sum,
         1,
     )
     assert weight_freeflow == 1.0
 
     weight_heavy = condition_weight(
-        congestion_profile1.traffic_condition,
-        test_flowtimevar.typeday,
+        json.dumps(congestion_profile1.traffic_condition),
+        json.dumps(test_flowtimevar.typeday),
         test_flowtimevar.typeday_sum,
         2,
     )
     assert weight_heavy == 0
 
     weight_saturated = condition_weight(
-        congestion_profile1.traffic_condition,
-        test_flowtimevar.typeday,
+        json.dumps(congestion_profile1.traffic_condition),
+        json.dumps(test_flowtimevar.typeday),
         test_flowtimevar.typeday_sum,
         3,
     )
     assert weight_saturated == 0
 
     weight_stopngo = condition_weight(
-        congestion_profile1.traffic_condition,
-        test_flowtimevar.typeday,
+        json.dumps(congestion_profile1.traffic_condition),
+        json.dumps(test_flowtimevar.typeday),
         test_flowtimevar.typeday_sum,
         4,
     )
@@ -57,3 +59,23 @@ def test_apply_condition_weight(test_flowtimevar, congestionprofiles):
     ).fetchall()
     assert recs[0][2] == 1.0
     assert recs[0][3] == 0.0
+
+
+def test_sqlite_cache_size(db):
+    with connection.cursor() as cur:
+        (cache_size,) = cur.execute("PRAGMA cache_size").fetchone()
+    assert cache_size == -SQLITE_CACHE_SIZE_KIB
+
+
+class OtherConnection:
+    """A database connection of another vendor than sqlite."""
+
+    vendor = "postgresql"
+
+    @property
+    def connection(self):
+        raise AssertionError("sqlite hooks used for other database vendor")
+
+
+def test_extend_other_vendor():
+    extend_sqlite(connection=OtherConnection())